@@ -0,0 +1,213 @@
+"""
+진달래꽃 음악 선호도 조사 - 마이크로벤치마크
+화면 한 번을 그릴 때 거치는 함수들(시트 값 파싱, 집계/통계, Plotly 그림 생성·직렬화,
+음원 매니페스트 읽기, 감상 키워드 색인)을 합성 데이터로 측정하고 baseline.json과 비교합니다.
+
+잡음과 기계 차이를 줄이기 위해 반복 중 가장 짧은 시간을 순수 Python 보정 루프 시간으로 나눈
+상대 시간으로 비교하고, 기준보다 --tolerance(기본 25%) 넘게 느려진 항목은 한 번 더 측정해
+그래도 느리면 종료 코드 1로 끝납니다.
+
+사용법:
+    python benchmarks/run_benchmarks.py               # 측정 후 baseline.json과 비교
+    python benchmarks/run_benchmarks.py --save        # 측정 결과를 baseline.json으로 저장
+    python benchmarks/run_benchmarks.py -k parse      # 이름에 'parse'가 들어간 항목만
+"""
+
+from datetime import datetime
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import plotly.express as px
+
+from comment_keywords import CommentKeywordIndex
+from survey_backend import build_crosstab, parse_survey_values, read_audio_manifest
+from survey_config import SurveyDefinition, load_survey_definition
+from survey_stats import chi_square_independence, leader_significance, wilson_intervals
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# 한 항목을 최소 MIN_TIME초 동안, 최소 MIN_ROUNDS번 반복해 중앙값을 씁니다.
+MIN_TIME = 0.5
+MIN_ROUNDS = 5
+MAX_ROUNDS = 200
+
+COMMENTS = [
+    "슬픈 노래가 마음에 남아요", "록 버전이 신선했어요", "피아노 반주가 아름다웠습니다",
+    "가사가 잘 들려서 좋았어요", "", "진달래꽃의 이별 정서가 잘 느껴졌어요",
+]
+
+def synthetic_values(survey, rows, seed=1):
+    """get_all_values() 모양(헤더 + 행)의 합성 응답을 만듭니다."""
+    rnd = random.Random(seed)
+    values = [list(survey.columns)]
+    for i in range(rows):
+        values.append([
+            f"2025-05-{i % 28 + 1:02d} 12:{i % 60:02d}:{i % 59:02d}",
+            rnd.choice(survey.version_labels),
+            rnd.choice(survey.age_groups),
+            rnd.choice(COMMENTS),
+        ])
+    return values
+
+def stats_block(survey, df):
+    """통계 탭이 그리는 값을 모두 계산합니다 (집계표, 합계, 신뢰구간, 검정)."""
+    crosstab = build_crosstab(df, {}, survey.age_groups, survey.version_labels)
+    version_counts = crosstab.sum(axis=0)
+    age_counts = crosstab.sum(axis=1).sort_values(ascending=False)
+    wilson_intervals(version_counts.values)
+    chi_square_independence(crosstab.values)
+    leader_significance(version_counts.values)
+    return crosstab, version_counts, age_counts
+
+def build_figures(crosstab, version_counts):
+    """통계 탭의 Plotly 그림 두 개를 만들고 브라우저로 보낼 JSON으로 직렬화합니다."""
+    fig1 = px.bar(
+        x=version_counts.index,
+        y=version_counts.values,
+        labels={'x': '버전', 'y': '득표수'},
+        title='버전별 득표수',
+        color=version_counts.values,
+        color_continuous_scale='Viridis'
+    )
+    fig2 = px.imshow(
+        crosstab,
+        labels=dict(x="버전", y="연령대", color="득표수"),
+        title='연령대별 버전 선호도',
+        color_continuous_scale='Blues',
+        aspect='auto'
+    )
+    return fig1.to_json(), fig2.to_json()
+
+def calibrate():
+    """기계 속도 보정용 순수 Python 루프입니다."""
+    total = 0
+    for i in range(200000):
+        total += i * i % 7
+    return total
+
+def define_benchmarks(survey, audio_dir):
+    """{이름: 인자 없는 함수}를 반환합니다. 데이터 준비는 측정 밖에서 미리 합니다."""
+    benchmarks = {}
+    for rows in (1000, 10000, 100000):
+        values = synthetic_values(survey, rows)
+        benchmarks[f'parse_survey_values[{rows // 1000}k]'] = (
+            lambda values=values: parse_survey_values(values, len(survey.columns))
+        )
+
+    df = parse_survey_values(synthetic_values(survey, 10000), len(survey.columns))
+    benchmarks['stats_block[10k]'] = lambda: stats_block(survey, df)
+
+    crosstab, version_counts, age_counts = stats_block(survey, df)
+    benchmarks['plotly_build_serialize'] = lambda: build_figures(crosstab, version_counts)
+
+    with open(survey.path, encoding='utf-8') as f:
+        audio_survey = SurveyDefinition(dict(json.load(f), music_folder=audio_dir), survey.path)
+    benchmarks['audio_manifest[7x2MB]'] = lambda: read_audio_manifest(audio_survey)
+
+    def keyword_index():
+        index = CommentKeywordIndex()
+        index.sync('bench', df)
+        return index.top(n=20)
+    benchmarks['keyword_index[10k]'] = keyword_index
+    return benchmarks
+
+def measure(fn):
+    """fn을 반복 실행해 {'median', 'min', 'rounds'} (초)를 반환합니다."""
+    fn()  # 워밍업 (임포트, 캐시 적재)
+    times = []
+    started = time.perf_counter()
+    while len(times) < MAX_ROUNDS and (len(times) < MIN_ROUNDS or time.perf_counter() - started < MIN_TIME):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return {'median': statistics.median(times), 'min': min(times), 'rounds': len(times)}
+
+def write_audio_files(survey, folder, size=2 * 1024 * 1024):
+    for label, path in survey.audio_files:
+        with open(os.path.join(folder, os.path.basename(path)), 'wb') as f:
+            f.write(os.urandom(size))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="마이크로벤치마크 실행 및 기준과 비교")
+    parser.add_argument('--save', action='store_true', help="결과를 기준(baseline.json)으로 저장")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="기준 파일 경로")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="허용 느려짐 비율 (기본 0.25 = 25%%)")
+    parser.add_argument('-k', dest='keyword', help="이름에 이 문자열이 들어간 항목만 실행")
+    args = parser.parse_args(argv)
+
+    survey = load_survey_definition(os.path.join(ROOT, 'surveys', 'azalea.json'))
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('benchmarks', {})
+
+    with tempfile.TemporaryDirectory() as audio_dir:
+        write_audio_files(survey, audio_dir)
+        benchmarks = {
+            name: fn for name, fn in define_benchmarks(survey, audio_dir).items()
+            if not args.keyword or args.keyword in name
+        }
+        calibration = measure(calibrate)['min']
+        results = {name: measure(fn) for name, fn in benchmarks.items()}
+        # 측정 도중 기계가 바빠졌을 수 있으므로 보정 루프는 앞뒤로 재서 빠른 쪽을 씁니다.
+        calibration = min(calibration, measure(calibrate)['min'])
+
+        def change_of(name):
+            results[name]['relative'] = results[name]['min'] / calibration
+            if name not in baseline:
+                return None
+            return results[name]['relative'] / baseline[name]['relative'] - 1
+
+        regressions = []
+        print(f"{'항목':<28}{'중앙값(ms)':>12}{'최소(ms)':>11}{'반복':>6}{'기준 대비':>10}")
+        for name in results:
+            change = change_of(name)
+            if change is not None and change > args.tolerance and not args.save:
+                # 일시적인 잡음인지 확인하려고 한 번 더 잽니다.
+                retry = measure(benchmarks[name])
+                if retry['min'] < results[name]['min']:
+                    results[name] = retry
+                change = change_of(name)
+            result = results[name]
+            line = f"{name:<28}{result['median'] * 1000:>12.2f}{result['min'] * 1000:>11.2f}{result['rounds']:>6}"
+            if change is not None:
+                line += f"{change * 100:>+9.1f}%"
+                if change > args.tolerance:
+                    regressions.append(name)
+                    line += "  ← 느려짐"
+            print(line)
+    print(f"(보정 루프 {calibration * 1000:.2f}ms 기준 상대 시간으로 비교)")
+
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'calibration_seconds': calibration,
+                'benchmarks': {
+                    name: {key: round(value, 6) for key, value in result.items()}
+                    for name, result in results.items()
+                },
+            }, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"기준을 저장했습니다: {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"허용치({args.tolerance * 100:.0f}%)보다 느려진 항목: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+진달래꽃 음악 선호도 조사 - 감상 키워드 색인
+한 줄 감상을 간단한 한국어 규칙으로 토큰화하고, 버전별 단어/두 단어 묶음 빈도를 누적합니다.
+새로 들어온 감상만 토큰화하므로 화면을 그릴 때마다 전체 감상 열을 다시 처리하지 않습니다.
+"""
+
+from collections import Counter
+import re
+import threading
+
+TOKEN_PATTERN = re.compile(r'[가-힣]+|[A-Za-z]+|\d+')
+
+# 길이가 긴 것부터 떼어냅니다 (조사, 자주 쓰는 어미)
+KOREAN_SUFFIXES = sorted([
+    '이에요', '예요', '입니다', '습니다', '합니다', '했어요', '해요', '네요', '어요', '아요', '에요',
+    '으로', '에서', '에게', '까지', '부터', '보다', '처럼', '이랑', '하고',
+    '은', '는', '이', '가', '을', '를', '에', '의', '도', '로', '와', '과', '만', '랑',
+], key=len, reverse=True)
+
+# 어미를 뗀 뒤 남는 과거 시제 표지 (슬펐었 → 슬펐)
+TENSE_MARKERS = ('았', '었', '였')
+
+# 떼어낸 뒤 남는 어간이 이보다 짧으면 떼지 않습니다 (포도 → 포, 같은 → 같 방지)
+MIN_STEM_LENGTH = 2
+
+STOPWORDS = {
+    '너무', '정말', '진짜', '그냥', '조금', '좀', '더', '잘', '것', '거', '수', '등', '이런', '그런',
+    '저', '제', '나', '내', '이', '그', '곡', '노래', '버전', '음악', '느낌',
+    'the', 'a', 'an', 'and', 'is', 'of', 'to', 'it',
+}
+
+def _strip_suffix(word):
+    for suffix in KOREAN_SUFFIXES:
+        if len(word) - len(suffix) >= MIN_STEM_LENGTH and word.endswith(suffix):
+            word = word[:-len(suffix)]
+            break
+    if len(word) > MIN_STEM_LENGTH and word.endswith(TENSE_MARKERS):
+        word = word[:-1]
+    return word
+
+def tokenize(text):
+    """감상 한 줄을 키워드 목록으로 바꿉니다 (조사·어미 제거, 불용어 제외)."""
+    tokens = []
+    for word in TOKEN_PATTERN.findall(str(text)):
+        word = _strip_suffix(word) if '가' <= word[0] <= '힣' else word.lower()
+        if word and word not in STOPWORDS:
+            tokens.append(word)
+    return tokens
+
+class CommentKeywordIndex:
+    """버전별 키워드·두 단어 묶음 빈도를 누적하는 증분 색인입니다.
+
+    sync()는 샤드마다 이미 처리한 행 수를 기억해 새로 추가된 행만 토큰화합니다.
+    여러 샤드의 빈도는 합계에 함께 누적되고, 한 샤드의 행 수가 줄었으면(시트를 직접 수정한 경우)
+    그 샤드의 몫만 빼고 현재 행으로 다시 셉니다.
+    """
+
+    def __init__(self):
+        self._words = {}
+        self._bigrams = {}
+        # 샤드 이름 -> (처리한 행 수, 버전별 단어 Counter, 버전별 두 단어 묶음 Counter)
+        self._shards = {}
+        self._lock = threading.Lock()
+
+    def _add(self, shard_words, shard_bigrams, version, text):
+        tokens = tokenize(text)
+        if not tokens:
+            return
+        bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for counters, items in ((shard_words, tokens), (self._words, tokens),
+                                (shard_bigrams, bigrams), (self._bigrams, bigrams)):
+            counters.setdefault(version, Counter()).update(items)
+
+    def sync(self, shard, df):
+        """샤드의 DataFrame(시간, 버전, 연령대, 감상)에서 아직 처리하지 않은 행만 색인합니다."""
+        if df is None or len(df.columns) < 4:
+            return
+        with self._lock:
+            consumed, shard_words, shard_bigrams = self._shards.get(shard, (0, {}, {}))
+            if len(df) < consumed:
+                for totals, counters in ((self._words, shard_words), (self._bigrams, shard_bigrams)):
+                    for version, counter in counters.items():
+                        totals[version] -= counter
+                        if not totals[version]:
+                            del totals[version]
+                consumed, shard_words, shard_bigrams = 0, {}, {}
+
+            new_rows = df.iloc[consumed:]
+            for version, comment in zip(new_rows.iloc[:, 1], new_rows.iloc[:, 3]):
+                self._add(shard_words, shard_bigrams, str(version).strip(), comment)
+            self._shards[shard] = (len(df), shard_words, shard_bigrams)
+
+    def shards(self):
+        """지금까지 색인한 샤드 이름 목록입니다."""
+        with self._lock:
+            return list(self._shards)
+
+    def versions(self):
+        with self._lock:
+            return sorted(self._words)
+
+    def top(self, version=None, n=20, bigrams=False):
+        """버전(None이면 전체)의 상위 n개 (키워드, 빈도) 목록을 반환합니다."""
+        with self._lock:
+            source = self._bigrams if bigrams else self._words
+            if version is not None:
+                return source.get(version, Counter()).most_common(n)
+            total = Counter()
+            for counter in source.values():
+                total.update(counter)
+        return total.most_common(n)
@@ -8,7 +8,10 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
+from collections import deque
 from datetime import datetime
+from urllib.parse import quote
+import threading
 import os
 
 # 페이지 설정
@@ -22,7 +25,9 @@ st.set_page_config(
 USE_GOOGLE_SHEETS = False
 try:
     from google.oauth2 import service_account
-    from googleapiclient.discovery import build
+    from google.auth.transport.requests import AuthorizedSession, Request
+    from requests.adapters import HTTPAdapter
+    from survey_backend import SHEETS_POOL_SIZE, TOKEN_REFRESH_MARGIN_SECONDS, TokenRefresher
     import json
     
     # Streamlit Secrets에서 자격증명 가져오기
@@ -37,12 +42,31 @@ except Exception as e:
     st.warning(f"Google Sheets 연동이 비활성화되었습니다. 로컬 저장소를 사용합니다.")
     USE_GOOGLE_SHEETS = False
 
+# Google Sheets 세션 (프로세스당 한 번만 생성)
+SHEETS_API_URL = "https://sheets.googleapis.com/v4/spreadsheets"
+
+@st.cache_resource
+def get_sheets_session():
+    """모든 요청이 공유하는 keep-alive HTTP 세션을 반환합니다.
+
+    본 앱(survey_backend)과 같은 방식으로 연결 풀 크기를 SHEETS_POOL_SIZE로 맞추고,
+    토큰은 만료 전에 백그라운드에서 갱신합니다. 세션은 여러 스레드가 동시에 써도 됩니다.
+    """
+    credentials.refresh(Request())
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=SHEETS_POOL_SIZE, pool_maxsize=SHEETS_POOL_SIZE)
+    session.mount('https://', adapter)
+    TokenRefresher(credentials, TOKEN_REFRESH_MARGIN_SECONDS).start()
+    return session
+
+def sheets_values_url(range_name, action=''):
+    return f"{SHEETS_API_URL}/{SPREADSHEET_ID}/values/{quote(range_name)}{action}"
+
 # Google Sheets 함수들
 def append_to_sheets(age_group, preferred_version):
     """Google Sheets에 데이터 추가"""
     try:
-        service = build('sheets', 'v4', credentials=credentials)
-        sheet = service.spreadsheets()
+        session = get_sheets_session()
         
         values = [[
             datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -52,12 +76,12 @@ def append_to_sheets(age_group, preferred_version):
         
         body = {'values': values}
         
-        result = sheet.values().append(
-            spreadsheetId=SPREADSHEET_ID,
-            range='응답!A:C',
-            valueInputOption='RAW',
-            body=body
-        ).execute()
+        response = session.post(
+            sheets_values_url('응답!A:C', ':append'),
+            params={'valueInputOption': 'RAW'},
+            json=body
+        )
+        response.raise_for_status()
         
         return True
     except Exception as e:
@@ -67,13 +91,11 @@ def append_to_sheets(age_group, preferred_version):
 def read_from_sheets():
     """Google Sheets에서 데이터 읽기"""
     try:
-        service = build('sheets', 'v4', credentials=credentials)
-        sheet = service.spreadsheets()
+        session = get_sheets_session()
         
-        result = sheet.values().get(
-            spreadsheetId=SPREADSHEET_ID,
-            range='응답!A2:C'  # 헤더 제외
-        ).execute()
+        response = session.get(sheets_values_url('응답!A2:C'))  # 헤더 제외
+        response.raise_for_status()
+        result = response.json()
         
         values = result.get('values', [])
         
@@ -89,28 +111,37 @@ def read_from_sheets():
         return pd.DataFrame(columns=['timestamp', 'age_group', 'preferred_version'])
 
 # 로컬 저장소 함수들 (fallback)
+# 응답은 세션이 아니라 프로세스에 한 벌만 두고, 최근 LOCAL_RESPONSES_MAX개까지만 보관합니다.
+LOCAL_RESPONSES_MAX = int(os.environ.get("LOCAL_RESPONSES_MAX", "10000"))
+
+@st.cache_resource
+def get_local_store():
+    """모든 세션이 공유하는 (응답 deque, 잠금)을 반환합니다."""
+    return deque(maxlen=LOCAL_RESPONSES_MAX), threading.Lock()
+
 def init_local_storage():
-    """세션 상태에 로컬 저장소 초기화"""
-    if 'responses' not in st.session_state:
-        st.session_state.responses = []
+    """로컬 저장소 초기화"""
+    get_local_store()
 
 def save_local_response(age_group, preferred_version):
-    """세션 상태에 응답 저장"""
-    if 'responses' not in st.session_state:
-        st.session_state.responses = []
-    
-    st.session_state.responses.append({
-        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        'age_group': age_group,
-        'preferred_version': preferred_version
-    })
+    """로컬 저장소에 응답 저장"""
+    responses, lock = get_local_store()
+    with lock:
+        responses.append({
+            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'age_group': age_group,
+            'preferred_version': preferred_version
+        })
 
 def get_local_responses():
-    """세션 상태에서 응답 가져오기"""
-    if 'responses' not in st.session_state or not st.session_state.responses:
+    """로컬 저장소에서 응답 가져오기"""
+    responses, lock = get_local_store()
+    with lock:
+        rows = list(responses)
+    if not rows:
         return pd.DataFrame(columns=['timestamp', 'age_group', 'preferred_version'])
     
-    return pd.DataFrame(st.session_state.responses)
+    return pd.DataFrame(rows)
 
 # 통합 저장/읽기 함수
 def save_response(age_group, preferred_version):
@@ -160,7 +191,7 @@ def main():
     if USE_GOOGLE_SHEETS:
         st.success("✅ Google Sheets 연동 활성화 - 데이터가 영구 저장됩니다")
     else:
-        st.info("ℹ️ 로컬 저장소 사용 중 - 페이지 새로고침 시 데이터가 초기화됩니다")
+        st.info("ℹ️ 로컬 저장소 사용 중 - 응답은 서버 메모리에만 보관되어 모든 방문자에게 함께 보이며, 앱을 다시 시작하면 초기화됩니다")
     
     # 탭 생성
     tab1, tab2 = st.tabs(["📝 설문 참여", "📊 통계 보기"])
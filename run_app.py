@@ -0,0 +1,22 @@
+"""
+진달래꽃 음악 선호도 조사 실행 스크립트
+Streamlit 서버를 띄우기 전에 같은 프로세스에서 워밍업을 시작하여,
+배포나 슬립 직후 첫 방문자가 Sheets 인증과 음원 로딩을 기다리지 않도록 합니다.
+
+사용법: python run_app.py [streamlit run 옵션...]
+예) python run_app.py --server.port $PORT --server.address 0.0.0.0
+"""
+
+import os
+import sys
+
+from streamlit.web import cli as stcli
+
+import survey_backend
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "music_survey_app.py")
+
+if __name__ == "__main__":
+    survey_backend.start_warmup(survey_backend.load_survey())
+    sys.argv = ["streamlit", "run", APP_SCRIPT] + sys.argv[1:]
+    sys.exit(stcli.main())
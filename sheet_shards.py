@@ -0,0 +1,208 @@
+"""
+진달래꽃 음악 선호도 조사 - 응답 시트 분할(샤딩)
+응답을 기간/행 수 단위의 워크시트로 나누어 저장하고, 지난 샤드는 요약 시트에 집계만 남깁니다.
+읽기는 요약 합계 + 현재 샤드만 가져오므로 설문 기간이 길어져도 읽기 비용이 일정합니다.
+"""
+
+from collections import Counter
+from datetime import datetime
+import threading
+
+import gspread
+
+# 응답 시트 열 순서: 시간, 버전, 연령대, 감상
+VERSION_INDEX = 1
+AGE_INDEX = 2
+
+SUMMARY_HEADER = ['샤드', '버전', '연령대', '득표수']
+
+def count_shard_rows(values):
+    """샤드의 get_all_values() 결과에서 (연령대, 버전)별 득표수를 셉니다."""
+    counts = Counter()
+    for row in values[1:]:
+        if not row or not str(row[0]).strip():
+            continue
+        row = list(row) + [''] * (AGE_INDEX + 1 - len(row))
+        counts[(row[AGE_INDEX].strip(), row[VERSION_INDEX].strip())] += 1
+    return counts
+
+class ShardedWorksheet:
+    """현재 샤드에 쓰고 읽는, gspread 워크시트와 같은 모양의 저장소입니다.
+
+    - period='month'이면 달이 바뀔 때, max_rows > 0이면 행 수가 넘칠 때 새 샤드로 넘어갑니다.
+    - 샤드 이름은 '{prefix}{YYYY-MM}' (같은 달에 넘치면 '_2', '_3' ...)입니다.
+    - 샤드가 없으면 기존 sheet1을 첫 샤드로 사용하므로 기존 데이터를 옮길 필요가 없습니다.
+    - 넘어간 샤드의 집계는 요약 시트에 (샤드, 버전, 연령대, 득표수) 행으로 한 번만 기록됩니다.
+    - guard(SheetsGuard)가 있으면 샤드 관리에 드는 추가 API 호출(샤드 목록, 새 샤드 만들기, 요약 기록 등)도
+      리미터를 거칩니다. append_row/get_all_values/values_and_summary 자체의 호출 한 번은
+      바깥에서 guard.call로 감싸 부르는 것을 전제로 합니다.
+    """
+
+    def __init__(self, spreadsheet, header, prefix='응답_', summary_title='요약',
+                 period='month', max_rows=0, guard=None, call_wait=10.0):
+        self.spreadsheet = spreadsheet
+        self.guard = guard
+        self.call_wait = call_wait
+        self.header = list(header)
+        self.prefix = prefix
+        self.summary_title = summary_title
+        self.period = period
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._summary = self._open_summary()
+        self._summary_counts, rolled = self._read_summary()
+
+        shards = sorted(
+            (ws for ws in self._call('read', spreadsheet.worksheets) if ws.title.startswith(prefix)),
+            key=lambda ws: self._shard_key(ws.title)
+        )
+        legacy = spreadsheet.sheet1
+        if not shards:
+            shards = [legacy]
+        elif legacy.title not in (summary_title, shards[0].title):
+            shards.insert(0, legacy)
+        # 이전에 요약 기록 도중 중단된 샤드가 있으면 마저 집계합니다.
+        for ws in shards[:-1]:
+            if ws.title not in rolled:
+                self._roll_up(ws)
+        self._closed = shards[:-1]
+        self._active = shards[-1]
+        self._active_period = self._period_of(self._active.title) or self._current_period()
+        self._active_rows = None
+
+    def _call(self, kind, fn, *args, **kwargs):
+        if self.guard is None:
+            return fn(*args, **kwargs)
+        return self.guard.call(kind, fn, *args, wait=self.call_wait, **kwargs)
+
+    @property
+    def title(self):
+        return self._active.title
+
+    def _current_period(self):
+        if self.period == 'month':
+            return datetime.now().strftime('%Y-%m')
+        return ''
+
+    def _shard_key(self, title):
+        period, _, seq = title[len(self.prefix):].partition('_')
+        return period, int(seq) if seq.isdigit() else 1
+
+    def _period_of(self, title):
+        if not title.startswith(self.prefix):
+            return None
+        return self._shard_key(title)[0]
+
+    def _open_summary(self):
+        try:
+            return self._call('read', self.spreadsheet.worksheet, self.summary_title)
+        except gspread.exceptions.WorksheetNotFound:
+            summary = self._call(
+                'write', self.spreadsheet.add_worksheet,
+                title=self.summary_title, rows=100, cols=len(SUMMARY_HEADER)
+            )
+            self._call('write', summary.append_row, SUMMARY_HEADER)
+            return summary
+
+    def _read_summary(self):
+        counts = Counter()
+        rolled = set()
+        for row in self._call('read', self._summary.get_all_values)[1:]:
+            if len(row) < 4 or not row[3].strip().isdigit():
+                continue
+            shard, version, age, count = row[:4]
+            rolled.add(shard)
+            if int(count):
+                counts[(age, version)] += int(count)
+        return counts, rolled
+
+    def _roll_up(self, worksheet, values=None):
+        if values is None:
+            values = self._call('read', worksheet.get_all_values)
+        counts = count_shard_rows(values)
+        rows = [[worksheet.title, version, age, count] for (age, version), count in sorted(counts.items())]
+        if not rows:
+            rows = [[worksheet.title, '', '', 0]]
+        self._call('write', self._summary.append_rows, rows)
+        self._summary_counts.update(counts)
+
+    def _next_title(self, period):
+        title = f"{self.prefix}{period}"
+        existing = {ws.title for ws in self._call('read', self.spreadsheet.worksheets)}
+        seq = 1
+        while title in existing:
+            seq += 1
+            title = f"{self.prefix}{period}_{seq}"
+        return title
+
+    def _needs_rotation(self, period):
+        if self.period == 'month' and period != self._active_period:
+            return True
+        return self.max_rows > 0 and self._active_rows >= self.max_rows
+
+    def _rotate(self, period):
+        """새 샤드를 만든 뒤 이전 샤드를 요약 시트에 집계합니다.
+
+        헤더는 이전 샤드의 첫 행을 그대로 이어받습니다.
+        """
+        previous = self._active
+        values = self._call('read', previous.get_all_values)
+        header = values[0] if values and any(values[0]) else self.header
+        rows = self.max_rows + 1 if self.max_rows > 0 else 1000
+        shard = self._call(
+            'write', self.spreadsheet.add_worksheet,
+            title=self._next_title(period), rows=rows, cols=len(header)
+        )
+        self._call('write', shard.append_row, header)
+        self._roll_up(previous, values)
+        self._closed.append(previous)
+        self._active = shard
+        self._active_period = period
+        self._active_rows = 0
+
+    def _prepare_append(self):
+        if self._active_rows is None:
+            self._active_rows = max(0, len(self._call('read', self._active.get_all_values)) - 1)
+        period = self._current_period()
+        if self._needs_rotation(period):
+            self._rotate(period)
+
+    def append_row(self, row, **kwargs):
+        with self._lock:
+            self._prepare_append()
+            result = self._active.append_row(row, **kwargs)
+            self._active_rows += 1
+            return result
+
+    def append_rows(self, rows, **kwargs):
+        """여러 행을 현재 샤드에 한 번에 씁니다 (한 번에 넣는 행들은 모두 같은 샤드에 들어감)."""
+        with self._lock:
+            self._prepare_append()
+            result = self._active.append_rows(rows, **kwargs)
+            self._active_rows += len(rows)
+            return result
+
+    def closed_shards(self):
+        """요약 시트로 넘어간 지난 샤드 워크시트 목록입니다 (오래된 것부터)."""
+        with self._lock:
+            return list(self._closed)
+
+    def shards(self):
+        """지난 샤드와 현재 샤드 워크시트 목록입니다 (오래된 것부터, 현재 샤드가 마지막)."""
+        with self._lock:
+            return self._closed + [self._active]
+
+    def get_all_values(self):
+        """현재 샤드의 값만 반환합니다 (헤더 포함)."""
+        return self.values_and_summary()[0]
+
+    def values_and_summary(self):
+        """(현재 샤드 값, 지난 샤드 합계)를 함께 반환합니다.
+
+        샤드 회전과 같은 잠금 안에서 읽으므로, 막 넘어간 샤드가 현재 샤드와 요약 양쪽에 들어가
+        두 번 세어지는 일이 없습니다.
+        """
+        with self._lock:
+            values = self._active.get_all_values()
+            self._active_rows = max(0, len(values) - 1)
+            return values, dict(self._summary_counts)
@@ -0,0 +1,283 @@
+"""
+진달래꽃 음악 선호도 조사 - Google Sheets 호출 보호 장치
+분당 할당량에 맞춘 토큰 버킷, 서킷 브레이커, 쓰기 재시도 큐를 제공합니다.
+"""
+
+from collections import deque
+import threading
+import time
+
+class SheetsUnavailable(Exception):
+    """리미터나 서킷 브레이커가 호출을 거절했을 때 발생합니다."""
+
+def error_status_code(error):
+    """API 예외에서 HTTP 상태 코드를 꺼냅니다 (없으면 None)."""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+def is_transient_error(error):
+    """429, 5xx, 네트워크 오류처럼 잠시 후 재시도하면 되는 오류인지 확인합니다."""
+    if isinstance(error, (SheetsUnavailable, ConnectionError, TimeoutError)):
+        return True
+    status = error_status_code(error)
+    if status is None:
+        return type(error).__module__.startswith(('requests', 'urllib3'))
+    return status == 429 or status >= 500
+
+class TokenBucket:
+    """분당 할당량에 맞춘 적응형 토큰 버킷입니다.
+
+    429 응답을 받으면 충전 속도를 절반으로 줄이고(penalize),
+    성공할 때마다 원래 속도까지 조금씩 회복합니다(AIMD).
+    """
+
+    MIN_RATE_FRACTION = 0.1
+    RECOVERY_FRACTION = 0.05
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.base_rate = per_minute / 60.0
+        self.rate = self.base_rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """토큰이 있으면 하나 사용하고 True를 반환합니다."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout):
+        """최대 timeout초 동안 토큰을 기다립니다."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.try_acquire():
+                return True
+            with self._lock:
+                wait = (1 - self._tokens) / self.rate
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def penalize(self):
+        """할당량 초과(429) 시 남은 토큰을 비우고 충전 속도를 줄입니다."""
+        with self._lock:
+            self._tokens = 0
+            self.rate = max(self.base_rate * self.MIN_RATE_FRACTION, self.rate / 2)
+
+    def reward(self):
+        """성공한 호출마다 충전 속도를 원래 값 쪽으로 회복합니다."""
+        with self._lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate * self.RECOVERY_FRACTION)
+
+    def state(self):
+        with self._lock:
+            self._refill()
+            return {
+                'tokens': round(self._tokens, 2),
+                'capacity': self.capacity,
+                'rate_per_minute': round(self.rate * 60, 2),
+            }
+
+class CircuitBreaker:
+    """연속 실패가 쌓이면 일정 시간 동안 호출을 차단합니다.
+
+    closed → (연속 실패 threshold회) → open → (reset_timeout 경과) → half_open
+    half_open 상태에서는 한 번의 시험 호출만 허용하고, 결과에 따라 닫히거나 다시 열립니다.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """지금 호출해도 되는지 반환합니다."""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_running = False
+            if self._state == self.HALF_OPEN:
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+            return True
+
+    def release(self):
+        """allow() 이후 실제 호출 없이 끝났을 때 시험 호출 자리를 돌려줍니다."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self._state == self.OPEN
+
+    def state(self):
+        with self._lock:
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+            }
+
+class SheetsGuard:
+    """읽기/쓰기 토큰 버킷과 공용 서킷 브레이커로 Sheets 호출을 감쌉니다."""
+
+    def __init__(self, read_limiter, write_limiter, breaker, metrics=None):
+        self.limiters = {'read': read_limiter, 'write': write_limiter}
+        self.breaker = breaker
+        self.metrics = metrics
+        self._local = threading.local()
+
+    def _count(self, name):
+        if self.metrics is not None:
+            self.metrics.incr(name)
+
+    def call(self, kind, fn, *args, wait=0.0, **kwargs):
+        """fn을 호출합니다. 리미터나 브레이커가 거절하면 SheetsUnavailable을 발생시킵니다.
+
+        fn 안에서 다시 call()로 나가는 호출(샤드 회전처럼 한 번의 쓰기가 부르는 추가 API 호출)은
+        토큰만 따로 받고, 브레이커 판정은 바깥 호출의 결과 한 번으로 합니다.
+        """
+        limiter = self.limiters[kind]
+        if getattr(self._local, 'active', False):
+            return self._call_nested(limiter, kind, fn, args, kwargs, wait)
+        if not self.breaker.allow():
+            self._count(f'sheets_{kind}_rejected_breaker')
+            raise SheetsUnavailable("Google Sheets 서킷 브레이커가 열려 있습니다.")
+        if not limiter.acquire(wait):
+            self.breaker.release()
+            self._count(f'sheets_{kind}_rejected_limiter')
+            raise SheetsUnavailable("Google Sheets 분당 할당량을 초과했습니다.")
+        settled = False
+        self._local.active = True
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if error_status_code(e) == 429:
+                limiter.penalize()
+            if is_transient_error(e):
+                self.breaker.record_failure()
+                settled = True
+                self._count(f'sheets_{kind}_errors')
+            raise
+        else:
+            limiter.reward()
+            self.breaker.record_success()
+            settled = True
+            self._count(f'sheets_{kind}_calls')
+            return result
+        finally:
+            self._local.active = False
+            # 400/403처럼 Sheets 장애가 아닌 오류나 중단으로 끝난 호출은 성공도 실패도 아니므로
+            # half_open 시험 호출 자리만 돌려줍니다 (돌려주지 않으면 브레이커가 계속 닫히지 않습니다).
+            if not settled:
+                self.breaker.release()
+
+    def _call_nested(self, limiter, kind, fn, args, kwargs, wait):
+        if not limiter.acquire(wait):
+            self._count(f'sheets_{kind}_rejected_limiter')
+            raise SheetsUnavailable("Google Sheets 분당 할당량을 초과했습니다.")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if error_status_code(e) == 429:
+                limiter.penalize()
+            raise
+        limiter.reward()
+        self._count(f'sheets_{kind}_calls')
+        return result
+
+    def state(self):
+        return {
+            'breaker': self.breaker.state(),
+            'read_limiter': self.limiters['read'].state(),
+            'write_limiter': self.limiters['write'].state(),
+        }
+
+class WriteQueue:
+    """Sheets가 거절한 쓰기를 보관했다가 백그라운드에서 순서대로 재시도합니다.
+
+    max_items를 넘으면 더 받지 않으므로, 장애가 길어져도 메모리가 한없이 늘지 않습니다.
+    """
+
+    def __init__(self, guard, retry_seconds, max_items=1000):
+        self.guard = guard
+        self.retry_seconds = retry_seconds
+        self.max_items = max_items
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="sheets-write-queue", daemon=True)
+        self._thread.start()
+
+    def put(self, worksheet, row, on_written=None, on_dropped=None):
+        """쓰기를 대기열에 넣습니다. 저장되면 on_written()을, 포기하고 버리면 on_dropped()를 호출합니다.
+
+        대기열이 가득 차 넣지 못했으면 False를 반환합니다.
+        """
+        with self._cond:
+            if len(self._items) >= self.max_items:
+                if self.guard.metrics is not None:
+                    self.guard.metrics.incr('sheets_write_queue_full')
+                return False
+            self._items.append((worksheet, row, on_written, on_dropped))
+            self._cond.notify()
+        return True
+
+    def pending(self):
+        return len(self._items)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._items:
+                    self._cond.wait()
+                worksheet, row, on_written, on_dropped = self._items[0]
+            try:
+                self.guard.call('write', worksheet.append_row, row, wait=self.retry_seconds)
+            except Exception as e:
+                if is_transient_error(e):
+                    time.sleep(self.retry_seconds)
+                    continue
+                # 재시도해도 성공할 수 없는 오류는 버립니다.
+                if self.guard.metrics is not None:
+                    self.guard.metrics.incr('sheets_write_dropped')
+                if on_dropped is not None:
+                    on_dropped()
+            else:
+                if on_written is not None:
+                    on_written()
+            with self._cond:
+                self._items.popleft()
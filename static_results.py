@@ -0,0 +1,222 @@
+"""
+진달래꽃 음악 선호도 조사 - 정적 결과 페이지
+공유 스냅샷의 집계를 results.json, chart.svg, index.html 파일로 내보냅니다.
+통계만 보러 오는 방문자는 Streamlit 세션 없이 이 파일들을 받으므로
+정적 파일 서버(Streamlit 정적 서빙, nginx, CDN)의 속도로 처리됩니다.
+
+파일은 임시 파일에 쓴 뒤 이름을 바꾸므로 읽는 쪽이 반쯤 쓰인 파일을 받는 일이 없습니다.
+
+사용법 (앱과 별도 프로세스로 돌릴 때):
+    python static_results.py --out /var/www/results [--survey azalea] [--every 60]
+"""
+
+from datetime import datetime
+from html import escape
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from survey_stats import chi_square_independence, leader_significance, wilson_intervals
+
+RECENT_COMMENTS = 10
+TOP_KEYWORDS = 20
+
+# 막대 그래프 크기와 색 (앱의 Viridis 막대와 비슷한 톤)
+CHART_WIDTH = 640
+CHART_BAR_HEIGHT = 28
+CHART_LABEL_WIDTH = 90
+CHART_COLORS = ['#440154', '#46327e', '#365c8d', '#277f8e', '#1fa187', '#4ac16d', '#a0da39', '#fde725']
+
+def build_results(survey, crosstab, df=None, keywords=()):
+    """연령대 × 버전 집계표와 스냅샷 DataFrame으로 공개용 결과 dict를 만듭니다."""
+    version_counts = crosstab.sum(axis=0)
+    age_counts = crosstab.sum(axis=1)
+    total = int(version_counts.sum())
+    shares, ci_low, ci_high = wilson_intervals(version_counts.values)
+
+    versions = [
+        {
+            'label': str(label),
+            'votes': int(count),
+            'share': round(float(share), 4),
+            'ci_low': round(float(low), 4),
+            'ci_high': round(float(high), 4),
+        }
+        for (label, count), share, low, high in zip(version_counts.items(), shares, ci_low, ci_high)
+    ]
+
+    leader = leader_significance(version_counts.values)
+    if leader:
+        leader = {
+            'label': str(version_counts.index[leader['leader']]),
+            'runner_up': str(version_counts.index[leader['runner_up']]),
+            'z': round(leader['z'], 3),
+            'significant': bool(leader['significant']),
+        }
+
+    independence = chi_square_independence(crosstab.values)
+    if independence:
+        independence = {key: round(value, 4) if key != 'dof' else value for key, value in independence.items()}
+
+    recent = []
+    if df is not None and len(df.columns) >= 4:
+        comments = df[~df.iloc[:, 3].astype(str).str.strip().isin(['', 'nan'])]
+        for version, comment in zip(comments.iloc[-RECENT_COMMENTS:, 1], comments.iloc[-RECENT_COMMENTS:, 3]):
+            recent.append({'version': str(version), 'comment': str(comment)})
+
+    return {
+        'survey': survey.id,
+        'title': survey.title,
+        'total_votes': total,
+        'versions': versions,
+        'age_groups': [{'label': str(label), 'votes': int(count)} for label, count in age_counts.items()],
+        'crosstab': {
+            'rows': [str(label) for label in crosstab.index],
+            'columns': [str(label) for label in crosstab.columns],
+            'values': crosstab.values.astype(int).tolist(),
+        },
+        'leader': leader,
+        'chi_square': independence,
+        'recent_comments': recent,
+        'keywords': [{'word': word, 'count': int(count)} for word, count in list(keywords)[:TOP_KEYWORDS]],
+    }
+
+def render_chart_svg(results):
+    """버전별 득표수 가로 막대 그래프(95% 신뢰구간 표시)를 SVG 문자열로 만듭니다."""
+    versions = results['versions']
+    top = max((version['votes'] for version in versions), default=0) or 1
+    plot_width = CHART_WIDTH - CHART_LABEL_WIDTH - 120
+    height = CHART_BAR_HEIGHT * len(versions) + 20
+    total = results['total_votes']
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{CHART_WIDTH}" height="{height}" '
+        f'viewBox="0 0 {CHART_WIDTH} {height}" font-family="sans-serif" font-size="13">'
+    ]
+    for i, version in enumerate(versions):
+        y = 10 + i * CHART_BAR_HEIGHT
+        width = plot_width * version['votes'] / top
+        color = CHART_COLORS[i % len(CHART_COLORS)]
+        parts.append(f'<text x="0" y="{y + 18}">{escape(version["label"])}</text>')
+        parts.append(
+            f'<rect x="{CHART_LABEL_WIDTH}" y="{y + 4}" width="{width:.1f}" '
+            f'height="{CHART_BAR_HEIGHT - 8}" fill="{color}" rx="3"/>'
+        )
+        if total:
+            # 신뢰구간은 득표수 축으로 환산해 막대 위에 선으로 그립니다.
+            low = CHART_LABEL_WIDTH + plot_width * version['ci_low'] * total / top
+            high = CHART_LABEL_WIDTH + plot_width * version['ci_high'] * total / top
+            mid = y + CHART_BAR_HEIGHT / 2
+            parts.append(
+                f'<line x1="{low:.1f}" y1="{mid}" x2="{min(high, CHART_WIDTH - 110):.1f}" y2="{mid}" '
+                f'stroke="#333" stroke-width="1.5"/>'
+            )
+        parts.append(
+            f'<text x="{CHART_WIDTH - 105}" y="{y + 18}">{version["votes"]}표 ({version["share"] * 100:.1f}%)</text>'
+        )
+    parts.append('</svg>')
+    return ''.join(parts)
+
+def render_html(results, chart_svg, refresh_seconds=60):
+    """결과 dict와 SVG로 스크립트 없는 단일 HTML 페이지를 만듭니다 (감상은 모두 이스케이프)."""
+    leader = results['leader']
+    if leader:
+        if leader['significant']:
+            leader_note = f"1위 {escape(leader['label'])}, 2위 {escape(leader['runner_up'])}보다 통계적으로 유의하게 앞서 있습니다."
+        else:
+            leader_note = f"1위({escape(leader['label'])})와 2위({escape(leader['runner_up'])})의 차이는 아직 통계적으로 유의하지 않습니다."
+    else:
+        leader_note = ""
+
+    age_rows = "".join(
+        f"<tr><td>{escape(age['label'])}</td><td>{age['votes']}명</td></tr>"
+        for age in results['age_groups'] if age['votes']
+    )
+    comments = "".join(
+        f"<li><b>{escape(item['version'])}</b> 💭 {escape(item['comment'])}</li>"
+        for item in reversed(results['recent_comments'])
+    ) or "<li>아직 등록된 감상이 없습니다.</li>"
+    keywords = " · ".join(
+        f"{escape(item['word'])}({item['count']})" for item in results['keywords']
+    )
+
+    return f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta http-equiv="refresh" content="{refresh_seconds}">
+<title>{escape(results['title'])} - 결과</title>
+<style>
+body {{ font-family: sans-serif; max-width: 720px; margin: 0 auto; padding: 20px; color: #222; }}
+h1 {{ font-size: 1.5em; }}
+table {{ border-collapse: collapse; }}
+td {{ padding: 2px 12px 2px 0; }}
+ul {{ padding-left: 1.2em; }}
+li {{ margin: 6px 0; }}
+.note {{ color: #666; font-size: 0.9em; }}
+svg {{ max-width: 100%; height: auto; }}
+</style>
+</head>
+<body>
+<h1>{escape(results['title'])}</h1>
+<p><b>총 투표 수: {results['total_votes']}표</b></p>
+<h2>🎵 버전별 득표 현황</h2>
+{chart_svg}
+<p class="note">선은 95% 신뢰구간입니다. {leader_note}</p>
+<h2>👥 연령대별 참여 현황</h2>
+<table>{age_rows}</table>
+<h2>💬 최근 참여자 감상</h2>
+<ul>{comments}</ul>
+{f'<h2>🔤 감상 키워드</h2><p>{keywords}</p>' if keywords else ''}
+<p class="note">{escape(results['generated_at'])} 기준 · {refresh_seconds}초마다 새로 고침 · <a href="results.json">JSON</a></p>
+</body>
+</html>
+"""
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def results_digest(results):
+    """생성 시각을 뺀 결과 내용의 해시입니다 (바뀌지 않았으면 다시 쓰지 않는 데 씁니다)."""
+    body = {key: value for key, value in results.items() if key != 'generated_at'}
+    return hashlib.sha1(json.dumps(body, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+def write_results(out_dir, results, refresh_seconds=60):
+    """results.json, chart.svg, index.html을 out_dir에 씁니다."""
+    os.makedirs(out_dir, exist_ok=True)
+    results = dict(results, generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    chart_svg = render_chart_svg(results)
+    _write_atomic(os.path.join(out_dir, 'results.json'), json.dumps(results, ensure_ascii=False, indent=1))
+    _write_atomic(os.path.join(out_dir, 'chart.svg'), chart_svg)
+    _write_atomic(os.path.join(out_dir, 'index.html'), render_html(results, chart_svg, refresh_seconds))
+
+def main(argv=None):
+    import survey_backend
+
+    parser = argparse.ArgumentParser(description="정적 결과 페이지 생성")
+    parser.add_argument('--out', default=survey_backend.STATIC_RESULTS_DIR, help="출력 폴더 (설문마다 하위 폴더)")
+    parser.add_argument('--survey', action='append', help="설문 id (여러 번 지정 가능, 없으면 전체)")
+    parser.add_argument('--every', type=float, default=0, help="이 간격(초)마다 반복 (0이면 한 번만)")
+    args = parser.parse_args(argv)
+
+    catalog = survey_backend.get_survey_catalog()
+    surveys = [catalog[survey_id] for survey_id in args.survey] if args.survey else list(catalog.values())
+    while True:
+        for survey in surveys:
+            runtime = survey_backend.get_survey_runtime(survey)
+            for thread in runtime.warmup_threads:
+                thread.join()
+            # 별도 프로세스에는 스냅샷을 갱신해 줄 방문자가 없으므로 직접 갱신합니다.
+            if survey_backend.publish_survey_results(runtime, args.out, refresh=True):
+                print(f"{survey.id}: {os.path.join(args.out, survey.id)}")
+        if not args.every:
+            return
+        time.sleep(args.every)
+
+if __name__ == '__main__':
+    main()
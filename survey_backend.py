@@ -0,0 +1,975 @@
+"""
+진달래꽃 음악 선호도 조사 - 백엔드 리소스
+Google Sheets 클라이언트, 설문 스냅샷, 음원 매니페스트를 프로세스 단위로 관리합니다.
+설문이 여러 개면 설문마다 자원을 따로 두고, 오래 쓰이지 않은 설문의 자원은 내보냅니다.
+"""
+
+import streamlit as st
+import gspread
+from google.oauth2 import service_account
+from google.auth.transport.requests import AuthorizedSession, Request
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from sheets_guard import (
+    CircuitBreaker,
+    SheetsGuard,
+    TokenBucket,
+    WriteQueue,
+    is_transient_error,
+)
+from sheet_shards import ShardedWorksheet
+from comment_keywords import CommentKeywordIndex
+from survey_config import load_survey_catalog
+from vote_guard import RecentVoteIndex, SlidingWindowLimiter, client_address, client_fingerprint
+from vote_journal import JournalLocked, VoteJournal, count_votes
+from static_results import build_results, results_digest, write_results
+from streamlit import runtime
+import pandas as pd
+from datetime import datetime
+from urllib.parse import quote
+import functools
+import glob
+import secrets
+import threading
+import time
+import os
+import json
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 설문 정의 폴더 (*.json 하나가 설문 하나)와 ?survey= 없이 접속했을 때 보여줄 설문 id
+SURVEYS_FOLDER = os.environ.get("SURVEYS_FOLDER", "surveys")
+DEFAULT_SURVEY = os.environ.get("DEFAULT_SURVEY", "azalea")
+
+# 동시에 메모리에 올려 둘 설문 수와, 이 시간(초) 동안 접속이 없으면 내보낼 기준
+SURVEY_RUNTIMES_MAX = int(os.environ.get("SURVEY_RUNTIMES_MAX", "16"))
+SURVEY_IDLE_SECONDS = float(os.environ.get("SURVEY_IDLE_SECONDS", "1800"))
+
+# 음원을 내려받을 http(s) 주소의 앞부분 (예: 'https://example.com/app/static/music' 또는 CDN 주소).
+# 설정하면 음원 bytes를 프로세스에 올리지 않고 브라우저가 '<주소>/<설문 id>/<파일 이름>'에서 직접 받습니다.
+# 설문마다 폴더를 나누므로 여러 설문에 같은 이름의 음원(version_1.mp3 등)이 있어도 섞이지 않습니다.
+AUDIO_BASE_URL = os.environ.get("AUDIO_BASE_URL", "").rstrip('/')
+
+# 정적 결과 페이지(results.json, chart.svg, index.html)를 쓸 폴더와 갱신 간격 (초).
+# 기본값은 앱 옆 static/results로, server.enableStaticServing이면 /app/static/results/<설문 id>/에서 받을 수 있습니다.
+# 빈 값이면 만들지 않습니다.
+APP_STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_RESULTS_DIR = os.environ.get("STATIC_RESULTS_DIR", os.path.join(APP_STATIC_DIR, "results"))
+STATIC_RESULTS_SECONDS = float(os.environ.get("STATIC_RESULTS_SECONDS", "30"))
+
+# 스냅샷 캐시 유지 시간 (초)
+SNAPSHOT_TTL_SECONDS = float(os.environ.get("SNAPSHOT_TTL_SECONDS", "15"))
+
+# 응답 시트 분할: 'month'이면 달마다, SHEETS_SHARD_MAX_ROWS(0이면 무제한)를 넘으면 새 워크시트로 넘어갑니다.
+# SHEETS_SHARDING=off이면 예전처럼 sheet1 하나에만 저장합니다.
+SHEETS_SHARDING = os.environ.get("SHEETS_SHARDING", "on") != "off"
+SHEETS_SHARD_PERIOD = os.environ.get("SHEETS_SHARD_PERIOD", "month")
+SHEETS_SHARD_MAX_ROWS = int(os.environ.get("SHEETS_SHARD_MAX_ROWS", "5000"))
+SHEETS_SUMMARY_TITLE = os.environ.get("SHEETS_SUMMARY_TITLE", "요약")
+
+# HTTP 연결 풀 크기 (세션당 keep-alive 연결 수)
+SHEETS_POOL_SIZE = int(os.environ.get("SHEETS_POOL_SIZE", "10"))
+
+# 토큰 만료 몇 초 전에 미리 갱신할지
+TOKEN_REFRESH_MARGIN_SECONDS = float(os.environ.get("TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+
+# Sheets 분당 할당량 (서비스 계정 기준 읽기/쓰기 각각)
+SHEETS_READS_PER_MINUTE = int(os.environ.get("SHEETS_READS_PER_MINUTE", "60"))
+SHEETS_WRITES_PER_MINUTE = int(os.environ.get("SHEETS_WRITES_PER_MINUTE", "60"))
+
+# 서킷 브레이커: 연속 실패 횟수와 차단 유지 시간 (초)
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "3"))
+BREAKER_RESET_SECONDS = float(os.environ.get("BREAKER_RESET_SECONDS", "30"))
+
+# 대기열에 쌓인 쓰기의 재시도 간격 (초)과 대기열에 보관할 최대 쓰기 수
+WRITE_RETRY_SECONDS = float(os.environ.get("WRITE_RETRY_SECONDS", "5"))
+WRITE_QUEUE_MAX = int(os.environ.get("WRITE_QUEUE_MAX", "1000"))
+
+# 투표 저장 작업 스레드 수와, 결과를 기다리는 투표표(ticket) 최대 보관 수
+VOTE_WORKERS = int(os.environ.get("VOTE_WORKERS", "4"))
+VOTE_TICKETS_MAX = int(os.environ.get("VOTE_TICKETS_MAX", "10000"))
+
+# 투표 저널 폴더 (설문마다 <id>.jsonl, 빈 값이면 사용 안 함)와 fsync를 묶는 간격 (초)
+VOTE_JOURNAL_DIR = os.environ.get("VOTE_JOURNAL_DIR", "journal")
+VOTE_JOURNAL_FSYNC_SECONDS = float(os.environ.get("VOTE_JOURNAL_FSYNC_SECONDS", "0.05"))
+# on이면 시작할 때 저널로 집계를 먼저 복원합니다 (저널에 전체 이력이 있을 때만 켜세요. vote_journal.py import 참고).
+VOTE_JOURNAL_SEED = os.environ.get("VOTE_JOURNAL_SEED", "off") == "on"
+
+# 중복 투표 차단 기간 (초, 0이면 사용 안 함)과 기억할 최대 지문 수
+DEDUP_WINDOW_SECONDS = float(os.environ.get("DEDUP_WINDOW_SECONDS", "86400"))
+DEDUP_MAX_ENTRIES = int(os.environ.get("DEDUP_MAX_ENTRIES", "100000"))
+
+# 투표 시도 제한: 윈도 길이 (초), 클라이언트별/접속 주소별/전체 허용 횟수
+# (주소별 한도는 한 교실이 같은 공인 IP를 쓰는 경우를 감안해 넉넉히 잡습니다)
+VOTE_LIMIT_WINDOW_SECONDS = float(os.environ.get("VOTE_LIMIT_WINDOW_SECONDS", "60"))
+VOTE_LIMIT_PER_CLIENT = int(os.environ.get("VOTE_LIMIT_PER_CLIENT", "5"))
+VOTE_LIMIT_PER_ADDRESS = int(os.environ.get("VOTE_LIMIT_PER_ADDRESS", "40"))
+VOTE_LIMIT_GLOBAL = int(os.environ.get("VOTE_LIMIT_GLOBAL", "120"))
+
+# 지문 해시용 salt (없으면 프로세스마다 임의로 생성)
+FINGERPRINT_SALT = os.environ.get("FINGERPRINT_SALT", "").encode('utf-8') or os.urandom(32)
+
+# 앞단 리버스 프록시가 X-Forwarded-For를 붙여 줄 때만 on (off면 소켓 상대 주소를 씁니다)
+TRUSTED_PROXY = os.environ.get("TRUSTED_PROXY", "off") == "on"
+
+SHEETS_SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+@st.cache_resource(show_spinner=False)
+def get_survey_catalog():
+    """설문 정의 폴더를 한 번만 읽고 검증해 {설문 id: SurveyDefinition}으로 반환합니다."""
+    return load_survey_catalog(SURVEYS_FOLDER)
+
+def load_survey(survey_id=None):
+    """설문 id(없으면 DEFAULT_SURVEY)의 정의를 반환합니다. 없는 id면 None을 반환합니다."""
+    return get_survey_catalog().get(survey_id or DEFAULT_SURVEY)
+
+class TokenRefresher:
+    """만료 전에 OAuth 토큰을 백그라운드에서 갱신합니다.
+
+    요청 경로에서 토큰이 만료되어 갱신 왕복이 끼어드는 일을 막습니다.
+    """
+
+    RETRY_SECONDS = 30
+
+    def __init__(self, credentials, margin_seconds):
+        self.credentials = credentials
+        self.margin_seconds = margin_seconds
+        self._request = Request()
+        self._thread = threading.Thread(target=self._run, name="sheets-token-refresh", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def seconds_until_refresh(self):
+        expiry = self.credentials.expiry
+        if expiry is None:
+            return 0
+        remaining = (expiry - datetime.utcnow()).total_seconds()
+        return max(0, remaining - self.margin_seconds)
+
+    def _run(self):
+        while True:
+            time.sleep(self.seconds_until_refresh())
+            try:
+                self.credentials.refresh(self._request)
+            except Exception:
+                time.sleep(self.RETRY_SECONDS)
+
+@st.cache_resource(show_spinner=False)
+def get_sheets_session():
+    """프로세스 전체에서 공유하는 (자격증명, keep-alive HTTP 세션)을 반환합니다."""
+    credentials_json = os.environ.get('GOOGLE_CREDENTIALS')
+    if not credentials_json:
+        return None, None
+
+    credentials = service_account.Credentials.from_service_account_info(
+        json.loads(credentials_json),
+        scopes=SHEETS_SCOPES
+    )
+    credentials.refresh(Request())
+
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=SHEETS_POOL_SIZE, pool_maxsize=SHEETS_POOL_SIZE)
+    session.mount('https://', adapter)
+
+    TokenRefresher(credentials, TOKEN_REFRESH_MARGIN_SECONDS).start()
+
+    return credentials, session
+
+def _build_gspread_client(credentials, session):
+    """공유 세션을 사용하는 gspread 클라이언트를 만듭니다 (gspread 5.x/6.x 호환)."""
+    try:
+        return gspread.Client(auth=credentials, session=session)
+    except TypeError:
+        http_client = functools.partial(gspread.HTTPClient, session=session)
+        return gspread.Client(auth=credentials, http_client=http_client)
+
+class Metrics:
+    """프로세스 단위 운영 지표 (카운터와 게이지)를 모읍니다."""
+
+    def __init__(self):
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def register_gauge(self, name, fn):
+        """조회 시점에 fn()을 호출해 값을 채우는 게이지를 등록합니다."""
+        self._gauges[name] = fn
+
+    def snapshot(self):
+        with self._lock:
+            result = dict(self._counters)
+        for name, fn in self._gauges.items():
+            result[name] = fn()
+        return result
+
+def count_sessions():
+    """현재 연결된 Streamlit 세션 수를 반환합니다 (서버 밖에서 실행 중이면 0)."""
+    if not runtime.exists():
+        return 0
+    session_mgr = getattr(runtime.get_instance(), '_session_mgr', None)
+    return session_mgr.num_active_sessions() if session_mgr else 0
+
+def current_rss_kb():
+    """지금 프로세스의 상주 메모리(KB)입니다 (/proc이 없는 환경이면 None).
+
+    세션 수가 늘었다 줄어도 이 값이 평평하게 유지되는지 지켜봅니다.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+def peak_rss_kb():
+    """프로세스가 시작한 뒤 가장 컸던 상주 메모리(KB, Linux 기준)입니다 (알 수 없으면 None)."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+@st.cache_resource(show_spinner=False)
+def get_metrics():
+    """프로세스 전체에서 공유하는 지표 저장소를 반환합니다."""
+    metrics = Metrics()
+    metrics.register_gauge('sessions_active', count_sessions)
+    metrics.register_gauge('process_rss_kb', current_rss_kb)
+    metrics.register_gauge('process_peak_rss_kb', peak_rss_kb)
+    return metrics
+
+@st.cache_resource(show_spinner=False)
+def get_sheets_guard():
+    """모든 세션이 공유하는 Sheets 리미터/서킷 브레이커를 반환합니다."""
+    metrics = get_metrics()
+    guard = SheetsGuard(
+        TokenBucket(SHEETS_READS_PER_MINUTE),
+        TokenBucket(SHEETS_WRITES_PER_MINUTE),
+        CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SECONDS),
+        metrics
+    )
+    metrics.register_gauge('sheets_guard', guard.state)
+    return guard
+
+# Google Sheets 연결 설정
+@st.cache_resource(show_spinner=False)
+def get_sharded_worksheet(_spreadsheet, spreadsheet_id, prefix, summary_title, header):
+    """스프레드시트(와 샤드 이름 규칙)마다 하나뿐인 ShardedWorksheet를 반환합니다.
+
+    설문 런타임을 내보냈다 다시 만들어도 이 저장소는 그대로 쓰므로, 대기열에 남은 쓰기와 새 런타임이
+    서로 다른 샤드 상태로 회전·요약 기록을 두 번 하는 일이 없습니다.
+    """
+    return ShardedWorksheet(
+        _spreadsheet,
+        header,
+        prefix=prefix,
+        summary_title=summary_title,
+        period=SHEETS_SHARD_PERIOD,
+        max_rows=SHEETS_SHARD_MAX_ROWS,
+        guard=get_sheets_guard()
+    )
+
+def open_survey_sheets(survey):
+    """설문의 저장 대상 스프레드시트를 열어 (클라이언트, 워크시트)를 반환합니다."""
+    try:
+        spreadsheet_id = survey.spreadsheet_id
+
+        if not spreadsheet_id:
+            return None, None
+
+        credentials, session = get_sheets_session()
+        if credentials is None:
+            return None, None
+
+        client = _build_gspread_client(credentials, session)
+        spreadsheet = client.open_by_key(spreadsheet_id)
+        if SHEETS_SHARDING:
+            worksheet = get_sharded_worksheet(
+                spreadsheet,
+                spreadsheet_id,
+                survey.sheet_prefix,
+                survey.summary_title or SHEETS_SUMMARY_TITLE,
+                tuple(survey.columns)
+            )
+        else:
+            worksheet = spreadsheet.sheet1
+
+        return client, worksheet
+
+    except Exception as e:
+        st.error(f"Google Sheets 연결 실패: {str(e)}")
+        return None, None
+
+# Google Sheets에서 데이터 가져오기
+def parse_survey_values(data, column_count=4):
+    """get_all_values() 결과를 설문 DataFrame으로 변환합니다 (앞의 column_count개 열만 사용)."""
+    if len(data) <= 1:
+        return None
+
+    headers = data[0]
+    rows = data[1:]
+
+    clean_headers = []
+    for i, h in enumerate(headers):
+        if h.strip() == '':
+            clean_headers.append(f'미사용{i}')
+        else:
+            clean_headers.append(h.strip())
+
+    seen = {}
+    final_headers = []
+    for h in clean_headers:
+        if h in seen:
+            seen[h] += 1
+            final_headers.append(f"{h}_{seen[h]}")
+        else:
+            seen[h] = 0
+            final_headers.append(h)
+
+    if len(final_headers) > column_count:
+        final_headers = final_headers[:column_count]
+        rows = [row[:column_count] for row in rows]
+
+    df = pd.DataFrame(rows, columns=final_headers)
+    df = df[df.iloc[:, 0].astype(str).str.strip() != '']
+
+    if len(df) == 0:
+        return None
+
+    return df
+
+def build_crosstab(df, summary_counts, age_groups=(), version_labels=()):
+    """현재 샤드 DataFrame과 지난 샤드 요약 합계를 합쳐 연령대 × 버전 득표수 표를 만듭니다.
+
+    설문 정의의 연령대/버전 순서로 행과 열을 고정하고(득표 없는 칸은 0),
+    정의에 없는 값이 시트에 있으면 뒤에 덧붙입니다.
+    """
+    tables = []
+    if df is not None and len(df.columns) >= 3:
+        tables.append(pd.crosstab(df[df.columns[2]], df[df.columns[1]]))
+    if summary_counts:
+        totals = pd.Series(summary_counts)
+        totals.index = pd.MultiIndex.from_tuples(totals.index)
+        tables.append(totals.unstack(fill_value=0))
+    if not tables:
+        return None
+
+    crosstab = tables[0]
+    for table in tables[1:]:
+        crosstab = crosstab.add(table, fill_value=0)
+    rows = list(age_groups) + sorted(set(crosstab.index) - set(age_groups))
+    columns = list(version_labels) + sorted(set(crosstab.columns) - set(version_labels))
+    crosstab = crosstab.reindex(index=rows, columns=columns, fill_value=0).fillna(0).astype(int)
+    crosstab.index.name = '연령대'
+    crosstab.columns.name = '버전'
+    return crosstab
+
+class SurveySnapshot:
+    """모든 세션이 공유하는 설문 데이터 스냅샷입니다.
+
+    TTL 안에서는 마지막으로 읽은 DataFrame을 그대로 돌려주고,
+    만료되면 한 스레드만 Google Sheets를 다시 읽습니다.
+    다른 스레드가 갱신 중이면 기다리지 않고 이전 스냅샷을 사용합니다.
+    Sheets가 거절하거나 실패하면 마지막 정상 스냅샷을 유지하고 degraded로 표시합니다.
+    집계표(crosstab)와 감상 키워드 색인(keywords)은 갱신할 때 새로 읽은 부분만 반영해
+    모든 세션이 함께 씁니다.
+    """
+
+    def __init__(self, ttl_seconds, survey):
+        self.ttl_seconds = ttl_seconds
+        self.survey = survey
+        self.degraded = False
+        self._lock = threading.Lock()
+        self._df = None
+        self.crosstab = None
+        self.keywords = CommentKeywordIndex()
+        self._loaded_at = None
+
+    def is_stale(self):
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl_seconds
+
+    def _load(self, worksheet):
+        # 샤드 저장소는 현재 샤드 값과 지난 샤드 합계를 한 번에 (회전과 겹치지 않게) 읽습니다.
+        read = getattr(worksheet, 'values_and_summary', None) or (lambda: (worksheet.get_all_values(), {}))
+        try:
+            data, summary_counts = get_sheets_guard().call('read', read)
+        except Exception as e:
+            self.degraded = True
+            if not is_transient_error(e):
+                st.error(f"데이터 로딩 실패: {str(e)}")
+        else:
+            self._df = parse_survey_values(data, len(self.survey.columns))
+            self.crosstab = build_crosstab(
+                self._df,
+                summary_counts,
+                self.survey.age_groups,
+                self.survey.version_labels
+            )
+            self.keywords.sync(getattr(worksheet, 'title', None), self._df)
+            self.degraded = False
+        self._loaded_at = time.monotonic()
+        return self._df
+
+    def refresh(self, worksheet):
+        """Google Sheets를 읽어 스냅샷을 갱신합니다."""
+        with self._lock:
+            return self._load(worksheet)
+
+    def get(self, worksheet):
+        """스냅샷을 반환하고, 만료되었으면 갱신합니다."""
+        if worksheet is None:
+            return None
+        if not self.is_stale():
+            return self._df
+        if self._loaded_at is not None and self._lock.locked():
+            return self._df
+        with self._lock:
+            if self.is_stale():
+                self._load(worksheet)
+            return self._df
+
+    def backfill_keywords(self, worksheet):
+        """지난 샤드의 감상을 한 번씩 읽어 키워드 색인에 더합니다.
+
+        지난 샤드는 요약 시트에 득표수만 남으므로, 프로세스를 다시 시작하거나 런타임을 새로 만든 뒤에도
+        키워드가 현재 샤드만 보지 않도록 런타임을 만들 때 한 번 읽습니다.
+        """
+        closed_shards = getattr(worksheet, 'closed_shards', None)
+        if closed_shards is None:
+            return
+        for shard in closed_shards():
+            try:
+                values = get_sheets_guard().call('read', shard.get_all_values)
+            except Exception:
+                get_metrics().incr('keyword_backfill_failed')
+                continue
+            self.keywords.sync(shard.title, parse_survey_values(values, len(self.survey.columns)))
+
+    def peek(self):
+        """마지막으로 읽은 DataFrame을 반환합니다 (만료되었어도 Sheets를 다시 읽지 않음)."""
+        return self._df
+
+    def invalidate(self):
+        """다음 조회 때 Google Sheets를 다시 읽도록 표시합니다."""
+        self._loaded_at = None
+
+    def seed(self, df, crosstab):
+        """아직 Sheets를 읽기 전이면 저널로 복원한 스냅샷을 먼저 채웁니다.
+
+        Sheets를 읽을 수 없는 동안에도 이 값이 마지막 정상 스냅샷 역할을 합니다.
+        """
+        with self._lock:
+            if self._loaded_at is not None:
+                return False
+            self._df = df
+            self.crosstab = crosstab
+            self._loaded_at = time.monotonic()
+            return True
+
+@st.cache_resource(show_spinner=False)
+def get_write_queue():
+    """Sheets가 일시적으로 거절한 투표를 재시도하는 대기열을 반환합니다."""
+    metrics = get_metrics()
+    queue = WriteQueue(get_sheets_guard(), WRITE_RETRY_SECONDS, WRITE_QUEUE_MAX)
+    metrics.register_gauge('sheets_write_queue_pending', queue.pending)
+    return queue
+
+@st.cache_resource(show_spinner=False)
+def get_vote_journal(survey_id):
+    """설문의 투표 저널을 반환합니다 (사용 안 함이거나 다른 프로세스가 쓰는 중이면 None)."""
+    if not VOTE_JOURNAL_DIR:
+        return None
+    path = os.path.join(VOTE_JOURNAL_DIR, f"{survey_id}.jsonl")
+    try:
+        return VoteJournal(path, VOTE_JOURNAL_FSYNC_SECONDS)
+    except JournalLocked:
+        get_metrics().incr('journal_locked')
+        return None
+
+def _on_vote_written(survey, seq):
+    invalidate_snapshot(survey)
+    if seq is not None:
+        get_vote_journal(survey.id).ack(seq)
+
+def _on_vote_failed(survey, seq, fingerprint=None):
+    # 포기한 투표는 저널에 fail로 남겨, 다음 실행에서 다시 보내거나 집계에 넣지 않게 합니다.
+    if seq is not None:
+        get_vote_journal(survey.id).fail(seq)
+    # 중복 투표 색인에서도 지워, 같은 사람이 차단 기간을 기다리지 않고 다시 투표할 수 있게 합니다.
+    if fingerprint is not None:
+        forget_vote(survey, fingerprint)
+
+def append_survey_row(survey, worksheet, row_data, seq=None, fingerprint=None):
+    """투표 한 줄을 저장하고, 저널 seq가 있으면 저장된 뒤 ack를 남깁니다.
+
+    바로 저장되면 'written', Sheets가 할당량 초과·장애 상태라 대기열에 넣었으면
+    'queued'를 반환합니다. 재시도해도 소용없는 오류이거나 대기열이 가득 찼으면
+    저널에 fail을 남기고 오류를 그대로 발생시킵니다.
+    """
+    try:
+        get_sheets_guard().call('write', worksheet.append_row, row_data)
+    except Exception as e:
+        if not is_transient_error(e):
+            _on_vote_failed(survey, seq, fingerprint)
+            raise
+        queued = get_write_queue().put(
+            worksheet,
+            row_data,
+            on_written=functools.partial(_on_vote_written, survey, seq),
+            on_dropped=functools.partial(_on_vote_failed, survey, seq, fingerprint)
+        )
+        if not queued:
+            _on_vote_failed(survey, seq, fingerprint)
+            raise
+        get_metrics().incr('sheets_write_queued')
+        return 'queued'
+    _on_vote_written(survey, seq)
+    return 'written'
+
+class VoteTickets:
+    """비동기 투표 저장 결과(Future)를 짧은 ticket 문자열로 보관합니다.
+
+    세션에는 ticket만 저장하고, 결과를 확인(pop)하면 항목을 지웁니다.
+    확인되지 않은 항목은 max_entries를 넘을 때 오래된 것부터 버립니다.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._futures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, future):
+        ticket = secrets.token_hex(8)
+        with self._lock:
+            self._futures[ticket] = future
+            while len(self._futures) > self.max_entries:
+                self._futures.popitem(last=False)
+        return ticket
+
+    def status(self, ticket):
+        """('pending'|'written'|'queued'|'failed'|'unknown', 오류) 를 반환합니다."""
+        future = self._futures.get(ticket)
+        if future is None:
+            return 'unknown', None
+        if not future.done():
+            return 'pending', None
+        error = future.exception()
+        if error is not None:
+            return 'failed', error
+        return future.result(), None
+
+    def pop(self, ticket):
+        with self._lock:
+            self._futures.pop(ticket, None)
+
+    def __len__(self):
+        return len(self._futures)
+
+@st.cache_resource(show_spinner=False)
+def get_vote_executor():
+    """투표 저장을 처리하는 공유 스레드 풀과 ticket 보관소를 반환합니다."""
+    executor = ThreadPoolExecutor(max_workers=VOTE_WORKERS, thread_name_prefix="vote-writer")
+    tickets = VoteTickets(VOTE_TICKETS_MAX)
+    get_metrics().register_gauge('vote_tickets_pending', tickets.__len__)
+    return executor, tickets
+
+def submit_vote(survey, worksheet, row_data, fingerprint=None):
+    """투표를 저널에 기록한 뒤 저장을 스레드 풀에 넘기고 바로 ticket을 반환합니다.
+
+    화면은 저장을 기다리지 않고 감사 인사를 먼저 보여주며,
+    이후 get_vote_status(ticket)으로 결과를 확인해 반영합니다.
+    저장을 끝내 포기하면 fingerprint를 중복 투표 색인에서 지웁니다.
+    """
+    executor, tickets = get_vote_executor()
+    journal = get_vote_journal(survey.id)
+    seq = journal.append(row_data) if journal is not None else None
+    get_metrics().incr('votes_submitted')
+    return tickets.add(executor.submit(append_survey_row, survey, worksheet, row_data, seq, fingerprint))
+
+def replay_unsaved_votes(survey, worksheet):
+    """지난 실행에서 저장되지 못한(ack 없는) 저널 투표를 다시 저장합니다. 프로세스당 한 번만 넘깁니다."""
+    journal = get_vote_journal(survey.id)
+    if journal is None:
+        return 0
+    executor, tickets = get_vote_executor()
+    recovered = journal.take_recovered()
+    for seq, row in recovered:
+        executor.submit(append_survey_row, survey, worksheet, row, seq)
+    get_metrics().incr('journal_replayed', len(recovered))
+    return len(recovered)
+
+def seed_snapshot_from_journal(survey, snapshot, recent=50):
+    """저널을 한 번 훑어 집계표와 최근 응답을 복원해 스냅샷을 채웁니다. 채웠으면 True를 반환합니다."""
+    journal = get_vote_journal(survey.id)
+    if journal is None:
+        return False
+    counts, recent_rows = count_votes(journal.votes(), recent)
+    if not counts:
+        return False
+    df = parse_survey_values([survey.columns] + recent_rows, len(survey.columns))
+    crosstab = build_crosstab(None, counts, survey.age_groups, survey.version_labels)
+    return snapshot.seed(df, crosstab)
+
+def get_vote_status(ticket):
+    """submit_vote가 돌려준 ticket의 저장 상태를 반환합니다. 끝난 ticket은 보관소에서 지웁니다."""
+    executor, tickets = get_vote_executor()
+    status, error = tickets.status(ticket)
+    if status != 'pending':
+        tickets.pop(ticket)
+        if status == 'failed':
+            get_metrics().incr('votes_failed')
+    return status, error
+
+@st.cache_resource(show_spinner=False)
+def get_vote_index():
+    """최근 투표한 클라이언트 지문 색인을 반환합니다."""
+    index = RecentVoteIndex(DEDUP_WINDOW_SECONDS, DEDUP_MAX_ENTRIES)
+    get_metrics().register_gauge('vote_index_size', index.__len__)
+    return index
+
+@st.cache_resource(show_spinner=False)
+def get_vote_throttles():
+    """(클라이언트별, 접속 주소별, 전체) 투표 시도 리미터를 반환합니다."""
+    per_client = SlidingWindowLimiter(VOTE_LIMIT_PER_CLIENT, VOTE_LIMIT_WINDOW_SECONDS)
+    per_address = SlidingWindowLimiter(VOTE_LIMIT_PER_ADDRESS, VOTE_LIMIT_WINDOW_SECONDS)
+    overall = SlidingWindowLimiter(VOTE_LIMIT_GLOBAL, VOTE_LIMIT_WINDOW_SECONDS, max_keys=1)
+    get_metrics().register_gauge('vote_throttle_clients', per_client.__len__)
+    get_metrics().register_gauge('vote_throttle_addresses', per_address.__len__)
+    return per_client, per_address, overall
+
+def check_vote_throttle(fingerprint, address):
+    """투표 시도를 기록하고, 제한에 걸리면 다시 시도할 수 있기까지 남은 초를 반환합니다 (통과 시 0).
+
+    지문은 쿠키를 바꾸면 새로 만들 수 있으므로, 한 사람이 전체 한도를 다 쓰지 못하도록
+    접속 주소별 한도를 전체 한도보다 먼저 확인합니다 (주소를 알 수 없으면 건너뜀).
+    """
+    per_client, per_address, overall = get_vote_throttles()
+    retry_after = per_client.hit(fingerprint)
+    if retry_after:
+        get_metrics().incr('votes_throttled_client')
+        return retry_after
+    if address:
+        retry_after = per_address.hit(address.encode('utf-8'))
+        if retry_after:
+            get_metrics().incr('votes_throttled_address')
+            return retry_after
+    retry_after = overall.hit(b'*')
+    if retry_after:
+        get_metrics().incr('votes_throttled_global')
+        return retry_after
+    return 0
+
+def get_client_address():
+    """현재 요청의 접속 주소를 반환합니다 (TRUSTED_PROXY가 아니면 전달 헤더는 무시)."""
+    return client_address(st.context.headers, st.context.ip_address, TRUSTED_PROXY)
+
+def get_client_fingerprint():
+    """현재 요청의 익명 클라이언트 지문을 반환합니다."""
+    return client_fingerprint(st.context.headers, st.context.cookies, FINGERPRINT_SALT, get_client_address())
+
+def _vote_key(survey, fingerprint):
+    # 중복 투표는 설문마다 따로 판단합니다 (투표 시도 제한은 설문과 관계없이 클라이언트 단위).
+    return survey.id.encode('utf-8') + b'\x1f' + fingerprint
+
+def is_duplicate_vote(survey, fingerprint):
+    """같은 클라이언트가 차단 기간 안에 이 설문에 이미 투표했는지 확인하고, 처음이면 기록합니다."""
+    if DEDUP_WINDOW_SECONDS <= 0:
+        return False
+    if get_vote_index().check_and_add(_vote_key(survey, fingerprint)):
+        get_metrics().incr('votes_duplicate')
+        return True
+    return False
+
+def forget_vote(survey, fingerprint):
+    """저장에 실패한 투표를 색인에서 지워 같은 클라이언트가 다시 투표할 수 있게 합니다."""
+    get_vote_index().discard(_vote_key(survey, fingerprint))
+
+def read_audio_manifest(survey):
+    """음원을 {버전 이름: (경로, 재생 소스)} 형태로 반환합니다.
+
+    재생 소스는 AUDIO_BASE_URL이 있으면 설문 id 폴더 아래 음원 주소, 없으면 파일 bytes(파일이 없으면 None)입니다.
+    """
+    manifest = {}
+    for label, music_file in survey.audio_files:
+        if AUDIO_BASE_URL:
+            url = f"{AUDIO_BASE_URL}/{quote(survey.id)}/{quote(os.path.basename(music_file))}"
+            manifest[label] = (music_file, url)
+        elif os.path.exists(music_file):
+            with open(music_file, 'rb') as audio_file:
+                manifest[label] = (music_file, audio_file.read())
+        else:
+            manifest[label] = (music_file, None)
+    return manifest
+
+class SurveyContent:
+    """한 번 읽어 둔 정적 콘텐츠 (페이지 머리/안내/푸터 HTML, 보상 탭 Markdown)입니다."""
+
+    def __init__(self, head, intro, reward_banner, footer, reward_tabs):
+        self.head = head
+        self.intro = intro
+        self.reward_banner = reward_banner
+        self.footer = footer
+        self.reward_tabs = reward_tabs
+
+    @property
+    def reward_labels(self):
+        return [label for label, body in self.reward_tabs]
+
+def parse_front_matter(text):
+    """'---'로 둘러싼 'key: value' 머리말과 본문을 분리합니다."""
+    meta = {}
+    if text.startswith('---\n'):
+        header, _, text = text[4:].partition('\n---\n')
+        for line in header.splitlines():
+            key, _, value = line.partition(':')
+            meta[key.strip()] = value.strip()
+    return meta, text
+
+def read_content(content_folder):
+    """콘텐츠 폴더를 읽어 SurveyContent로 반환합니다.
+
+    보상 탭은 rewards/*.md 파일 이름 순서대로, 머리말의 tab 값을 탭 이름으로 사용합니다.
+    """
+    def read(path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    pages = {
+        name: read(os.path.join(content_folder, f"{name}.html"))
+        for name in ('head', 'intro', 'reward_banner', 'footer')
+    }
+
+    reward_tabs = []
+    for path in sorted(glob.glob(os.path.join(content_folder, 'rewards', '*.md'))):
+        meta, body = parse_front_matter(read(path))
+        label = meta.get('tab') or os.path.splitext(os.path.basename(path))[0]
+        reward_tabs.append((label, body))
+
+    return SurveyContent(reward_tabs=reward_tabs, **pages)
+
+class SurveyRuntime:
+    """설문 하나가 쓰는 프로세스 자원 (Sheets 워크시트, 스냅샷, 음원, 콘텐츠)입니다.
+
+    각 자원은 처음 필요할 때 한 번만 만들고, 동시에 요청되면 먼저 시작한 쪽이 끝나기를 기다립니다.
+    """
+
+    def __init__(self, survey):
+        self.survey = survey
+        self.snapshot = SurveySnapshot(SNAPSHOT_TTL_SECONDS, survey)
+        self.last_used = time.monotonic()
+        self.warmup_threads = []
+        self.published_digest = None
+        self._resources = {}
+        self._locks = {name: threading.Lock() for name in ('sheets', 'audio', 'content')}
+
+    def _resource(self, name, build, *args):
+        with self._locks[name]:
+            if name not in self._resources:
+                self._resources[name] = build(*args)
+            return self._resources[name]
+
+    def sheets(self):
+        return self._resource('sheets', open_survey_sheets, self.survey)
+
+    def audio_manifest(self):
+        return self._resource('audio', read_audio_manifest, self.survey)
+
+    def content(self):
+        return self._resource('content', read_content, self.survey.content_folder)
+
+    def _warm_up_sheets(self):
+        """(설정 시) 저널로 집계 복원, OAuth 인증, 워크시트 열기, 못다 한 저장 재시도, 첫 스냅샷 적재,
+        지난 샤드 감상 키워드 색인을 수행합니다.
+
+        저널로 스냅샷을 채웠으면 시작할 때 시트를 내려받지 않고, TTL이 지난 뒤 첫 조회 때 읽습니다.
+        """
+        seeded = VOTE_JOURNAL_SEED and seed_snapshot_from_journal(self.survey, self.snapshot)
+        client, worksheet = self.sheets()
+        if worksheet is not None:
+            replay_unsaved_votes(self.survey, worksheet)
+            if not seeded:
+                self.snapshot.refresh(worksheet)
+            self.snapshot.backfill_keywords(worksheet)
+
+    def warm_up(self):
+        """Sheets 연결·스냅샷, 음원 매니페스트, 정적 콘텐츠를 병렬 백그라운드 스레드로 준비합니다."""
+        self.warmup_threads = [
+            threading.Thread(target=self._warm_up_sheets, name=f"warmup-sheets-{self.survey.id}", daemon=True),
+            threading.Thread(target=self.audio_manifest, name=f"warmup-audio-{self.survey.id}", daemon=True),
+            threading.Thread(target=self.content, name=f"warmup-content-{self.survey.id}", daemon=True),
+        ]
+        for thread in self.warmup_threads:
+            thread.start()
+        return self.warmup_threads
+
+class SurveyRegistry:
+    """설문 id별 SurveyRuntime을 최근 사용 순서(LRU)로 보관합니다.
+
+    max_active개를 넘거나 idle_seconds 동안 접속이 없던 설문은 오래된 것부터 내보내므로
+    설문이 수십 개여도 실제로 접속 중인 설문의 음원·스냅샷만 메모리에 남습니다.
+    내보낸 설문은 다음 접속 때 다시 만들어 워밍업합니다 (샤드 저장소는 get_sharded_worksheet가 계속 보관).
+    """
+
+    def __init__(self, max_active, idle_seconds, on_evict=None):
+        self.max_active = max_active
+        self.idle_seconds = idle_seconds
+        self.on_evict = on_evict
+        self._runtimes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        evicted = []
+        while len(self._runtimes) > 1:
+            survey_id, runtime = next(iter(self._runtimes.items()))
+            if len(self._runtimes) <= self.max_active and now - runtime.last_used <= self.idle_seconds:
+                break
+            self._runtimes.popitem(last=False)
+            evicted.append(survey_id)
+        return evicted
+
+    def get(self, survey):
+        """설문의 런타임을 반환합니다. 처음이거나 내보낸 뒤라면 새로 만들고 워밍업을 시작합니다."""
+        now = time.monotonic()
+        with self._lock:
+            runtime = self._runtimes.pop(survey.id, None)
+            created = runtime is None
+            if created:
+                runtime = SurveyRuntime(survey)
+            runtime.last_used = now
+            self._runtimes[survey.id] = runtime
+            evicted = self._evict(now)
+        if created:
+            runtime.warm_up()
+        if self.on_evict:
+            for survey_id in evicted:
+                self.on_evict(survey_id)
+        return runtime
+
+    def active(self):
+        """올라와 있는 런타임 목록입니다 (최근 사용 시각은 바꾸지 않음)."""
+        with self._lock:
+            return list(self._runtimes.values())
+
+    def peek(self, survey_id):
+        """올라와 있는 런타임을 반환합니다 (없으면 None, 새로 만들지 않음)."""
+        return self._runtimes.get(survey_id)
+
+    def __len__(self):
+        return len(self._runtimes)
+
+@st.cache_resource(show_spinner=False)
+def get_survey_registry():
+    """프로세스 전체에서 공유하는 설문 런타임 보관소를 반환합니다."""
+    metrics = get_metrics()
+    registry = SurveyRegistry(
+        SURVEY_RUNTIMES_MAX,
+        SURVEY_IDLE_SECONDS,
+        on_evict=lambda survey_id: metrics.incr('surveys_evicted')
+    )
+    metrics.register_gauge('surveys_active', registry.__len__)
+    return registry
+
+def get_survey_runtime(survey):
+    """설문의 런타임을 반환하고 최근 사용 시각을 갱신합니다."""
+    return get_survey_registry().get(survey)
+
+def get_google_sheets_client(survey):
+    """설문의 (Google Sheets 클라이언트, 워크시트)를 반환합니다."""
+    return get_survey_runtime(survey).sheets()
+
+def get_snapshot_store(survey):
+    """설문의 모든 세션이 공유하는 스냅샷을 반환합니다."""
+    return get_survey_runtime(survey).snapshot
+
+def invalidate_snapshot(survey):
+    """설문 스냅샷을 다음 조회 때 다시 읽도록 표시합니다 (내보낸 설문이면 아무것도 하지 않음)."""
+    runtime = get_survey_registry().peek(survey.id)
+    if runtime is not None:
+        runtime.snapshot.invalidate()
+
+def load_audio_manifest(survey):
+    """설문의 음원 매니페스트를 반환합니다 (런타임마다 한 번만 읽음)."""
+    return get_survey_runtime(survey).audio_manifest()
+
+def load_content(survey):
+    """설문의 정적 콘텐츠를 반환합니다 (런타임마다 한 번만 읽음)."""
+    return get_survey_runtime(survey).content()
+
+def publish_survey_results(runtime, out_dir=STATIC_RESULTS_DIR, refresh=False):
+    """설문 스냅샷으로 정적 결과 파일을 씁니다. 내용이 바뀌었을 때만 쓰고, 썼으면 True를 반환합니다.
+
+    기본으로는 방문자가 이미 읽어 둔 스냅샷만 쓰고 Sheets를 읽지 않습니다.
+    refresh=True이면 스냅샷이 만료되었을 때 다시 읽습니다 (앱과 별도 프로세스로 돌릴 때).
+    """
+    snapshot = runtime.snapshot
+    if refresh:
+        client, worksheet = runtime.sheets()
+        df = snapshot.get(worksheet)
+    else:
+        df = snapshot.peek()
+    if snapshot.crosstab is None:
+        return False
+    results = build_results(runtime.survey, snapshot.crosstab, df, snapshot.keywords.top(n=20))
+    digest = results_digest(results)
+    if digest == runtime.published_digest:
+        return False
+    write_results(os.path.join(out_dir, runtime.survey.id), results, int(STATIC_RESULTS_SECONDS * 2))
+    runtime.published_digest = digest
+    get_metrics().incr('static_results_written')
+    return True
+
+def static_results_url(survey):
+    """정적 결과 페이지의 (앱 기준 상대) 주소를 반환합니다.
+
+    결과 폴더가 앱의 static/ 아래에 있고 server.enableStaticServing이 켜져 있을 때만 Streamlit이
+    파일을 내보내므로, 그렇지 않으면 None을 반환합니다 (다른 웹 서버로 내보내는 경우).
+    """
+    if not STATIC_RESULTS_DIR or not st.get_option('server.enableStaticServing'):
+        return None
+    relative = os.path.relpath(os.path.abspath(STATIC_RESULTS_DIR), APP_STATIC_DIR)
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep) or os.path.isabs(relative):
+        return None
+    parts = [] if relative == os.curdir else relative.split(os.sep)
+    return '/'.join(['app', 'static'] + [quote(part) for part in parts + [survey.id, 'index.html']])
+
+def _publish_results_forever():
+    while True:
+        now = time.monotonic()
+        for survey_runtime in get_survey_registry().active():
+            # 한동안 방문자가 없던 설문은 스냅샷도 바뀌지 않으므로 건너뜁니다.
+            if now - survey_runtime.last_used > SURVEY_IDLE_SECONDS:
+                continue
+            try:
+                publish_survey_results(survey_runtime)
+            except Exception:
+                get_metrics().incr('static_results_failed')
+        time.sleep(STATIC_RESULTS_SECONDS)
+
+@st.cache_resource(show_spinner=False)
+def start_results_publisher():
+    """메모리에 올라와 있는 설문의 정적 결과 파일을 주기적으로 갱신하는 스레드를 시작합니다."""
+    if not STATIC_RESULTS_DIR:
+        return None
+    thread = threading.Thread(target=_publish_results_forever, name="static-results", daemon=True)
+    thread.start()
+    return thread
+
+# 서버 시작 시 워밍업
+def start_warmup(survey):
+    """설문 런타임을 올리고 워밍업 스레드 목록을 반환합니다.
+
+    런타임을 처음 만들 때만 스레드가 시작되므로 여러 번 호출해도 됩니다.
+    정적 결과 페이지 갱신 스레드도 여기서 (프로세스당 한 번) 시작합니다.
+    """
+    start_results_publisher()
+    return get_survey_runtime(survey).warmup_threads
@@ -0,0 +1,115 @@
+"""
+진달래꽃 음악 선호도 조사 - 설문 정의
+버전 목록, 연령대, 저장 열, 콘텐츠 경로, 저장 대상 등 설문마다 달라지는 값을 JSON 파일에서 읽고 검증합니다.
+"""
+
+import glob
+import json
+import os
+import re
+
+# 응답 열의 역할 순서: 시간, 버전, 연령대, 감상
+COLUMN_ROLES = ('timestamp', 'version', 'age', 'comment')
+
+# 설문 id는 주소(?survey=<id>)에 그대로 쓰이므로 영문/숫자/-/_만 허용합니다.
+SURVEY_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+class SurveyConfigError(ValueError):
+    """설문 정의 파일이 잘못되었을 때 발생합니다."""
+
+class SurveyDefinition:
+    """검증을 마친 설문 정의입니다. 화면, 폼, 저장 구조, 집계표 모양이 모두 여기서 나옵니다."""
+
+    def __init__(self, data, path):
+        self.path = path
+        self.id = data['id']
+        self.title = data['title']
+        self.page_title = data.get('page_title', self.title)
+        self.page_icon = data.get('page_icon', '🎵')
+        self.content_folder = data['content_folder']
+        self.music_folder = data['music_folder']
+        self.gallery_columns = data.get('gallery_columns', 3)
+        self.gallery_header = data.get('gallery_header', '🎵 음악을 들어보세요')
+        self.reward_hint = data.get('reward_hint', '')
+        self.versions = [dict(version) for version in data['versions']]
+        self.age_groups = list(data['age_groups'])
+        self.columns = list(data['columns'])
+        # 저장 대상: 스프레드시트 id를 담은 환경 변수 이름, 샤드 이름 접두어, 요약 시트 이름
+        self.spreadsheet_id_env = data.get('spreadsheet_id_env', 'SPREADSHEET_ID')
+        self.sheet_prefix = data.get('sheet_prefix', '응답_')
+        self.summary_title = data.get('summary_title')
+
+    @property
+    def spreadsheet_id(self):
+        return os.environ.get(self.spreadsheet_id_env)
+
+    @property
+    def version_labels(self):
+        return [version['label'] for version in self.versions]
+
+    @property
+    def audio_files(self):
+        """(버전 이름, 음원 경로) 목록입니다."""
+        return [
+            (version['label'], os.path.join(self.music_folder, version['audio']))
+            for version in self.versions
+        ]
+
+def _require(condition, path, message):
+    if not condition:
+        raise SurveyConfigError(f"{path}: {message}")
+
+def validate_survey_data(data, path):
+    """설문 정의 dict를 검증합니다. 문제가 있으면 SurveyConfigError를 발생시킵니다."""
+    _require(isinstance(data, dict), path, "최상위 값은 객체여야 합니다.")
+    for key in ('id', 'title', 'content_folder', 'music_folder'):
+        _require(isinstance(data.get(key), str) and data[key].strip(), path, f"'{key}' 문자열이 필요합니다.")
+    _require(SURVEY_ID_PATTERN.match(data['id']), path, "'id'에는 영문, 숫자, '-', '_'만 쓸 수 있습니다.")
+    for key in ('spreadsheet_id_env', 'sheet_prefix', 'summary_title'):
+        _require(key not in data or (isinstance(data[key], str) and data[key].strip()), path, f"'{key}'는 빈 문자열이 아니어야 합니다.")
+
+    versions = data.get('versions')
+    _require(isinstance(versions, list) and len(versions) >= 2, path, "'versions'에 두 개 이상의 버전이 필요합니다.")
+    for i, version in enumerate(versions):
+        _require(
+            isinstance(version, dict) and version.get('label') and version.get('audio'),
+            path, f"versions[{i}]에는 'label'과 'audio'가 필요합니다."
+        )
+    labels = [version['label'] for version in versions]
+    _require(len(set(labels)) == len(labels), path, "버전 이름(label)이 중복되었습니다.")
+
+    age_groups = data.get('age_groups')
+    _require(isinstance(age_groups, list) and age_groups, path, "'age_groups' 목록이 필요합니다.")
+    _require(len(set(age_groups)) == len(age_groups), path, "연령대가 중복되었습니다.")
+
+    columns = data.get('columns')
+    _require(
+        isinstance(columns, list) and len(columns) == len(COLUMN_ROLES) and all(columns),
+        path, f"'columns'에는 {'/'.join(COLUMN_ROLES)} 순서의 열 이름 {len(COLUMN_ROLES)}개가 필요합니다."
+    )
+
+    gallery_columns = data.get('gallery_columns', 3)
+    _require(isinstance(gallery_columns, int) and gallery_columns >= 1, path, "'gallery_columns'는 1 이상의 정수여야 합니다.")
+
+    _require(os.path.isdir(data['content_folder']), path, f"콘텐츠 폴더를 찾을 수 없습니다: {data['content_folder']}")
+
+def load_survey_definition(path):
+    """설문 정의 JSON 파일을 읽고 검증해 SurveyDefinition으로 반환합니다."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise SurveyConfigError(f"{path}: 설문 정의를 읽을 수 없습니다 ({e})") from e
+    validate_survey_data(data, path)
+    return SurveyDefinition(data, path)
+
+def load_survey_catalog(folder):
+    """폴더의 설문 정의(*.json)를 모두 읽고 검증해 {설문 id: SurveyDefinition}으로 반환합니다."""
+    catalog = {}
+    for path in sorted(glob.glob(os.path.join(folder, '*.json'))):
+        survey = load_survey_definition(path)
+        if survey.id in catalog:
+            raise SurveyConfigError(f"{path}: 설문 id '{survey.id}'가 {catalog[survey.id].path}와 중복됩니다.")
+        catalog[survey.id] = survey
+    _require(catalog, folder, "설문 정의 파일(*.json)이 없습니다.")
+    return catalog
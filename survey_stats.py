@@ -0,0 +1,116 @@
+"""
+진달래꽃 음악 선호도 조사 - 통계 검정
+집계 행렬(연령대 × 버전)에서 신뢰구간, 카이제곱 독립성 검정, 1위 유의성을 계산합니다.
+SciPy 없이 NumPy 벡터 연산만 사용하므로 매 갱신마다 다시 계산해도 부담이 없습니다.
+"""
+
+import math
+
+import numpy as np
+
+# 95% 양측 신뢰수준의 z 값
+Z_95 = 1.959963984540054
+
+def wilson_intervals(counts, z=Z_95):
+    """버전별 득표수에 대한 득표율과 Wilson 점수 신뢰구간을 반환합니다.
+
+    반환값: (득표율, 하한, 상한) - 모두 counts와 같은 길이의 배열
+    """
+    counts = np.asarray(counts, dtype=float)
+    n = counts.sum()
+    if n == 0:
+        zeros = np.zeros_like(counts)
+        return zeros, zeros, zeros
+    p = counts / n
+    z2 = z * z
+    denom = 1 + z2 / n
+    center = (p + z2 / (2 * n)) / denom
+    margin = z * np.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / denom
+    # 반올림 오차로 구간이 득표율을 벗어나지 않도록 [0, p], [p, 1]로 자릅니다.
+    return p, np.clip(center - margin, 0, p), np.clip(center + margin, p, 1)
+
+def _upper_incomplete_gamma_q(a, x):
+    """정규화된 상부 불완전 감마함수 Q(a, x)입니다 (급수/연분수 전개)."""
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        # 급수 전개로 P(a, x)를 구한 뒤 1 - P
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(500):
+            ap += 1
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # Lentz 방법으로 연분수 전개
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 500):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return math.exp(log_prefix) * h
+
+def chi_square_sf(statistic, dof):
+    """자유도 dof인 카이제곱 분포의 상단 꼬리 확률(p-value)입니다."""
+    if dof <= 0:
+        return 1.0
+    return _upper_incomplete_gamma_q(dof / 2.0, statistic / 2.0)
+
+def chi_square_independence(matrix):
+    """분할표에 대한 카이제곱 독립성 검정 결과를 반환합니다.
+
+    합이 0인 행/열은 제외합니다. 표가 2×2보다 작으면 None을 반환합니다.
+    반환값: {'statistic', 'dof', 'p_value', 'min_expected'}
+    """
+    observed = np.asarray(matrix, dtype=float)
+    observed = observed[observed.sum(axis=1) > 0][:, observed.sum(axis=0) > 0]
+    if observed.ndim != 2 or min(observed.shape) < 2:
+        return None
+    row_totals = observed.sum(axis=1, keepdims=True)
+    col_totals = observed.sum(axis=0, keepdims=True)
+    expected = row_totals * col_totals / observed.sum()
+    statistic = float(((observed - expected) ** 2 / expected).sum())
+    dof = (observed.shape[0] - 1) * (observed.shape[1] - 1)
+    return {
+        'statistic': statistic,
+        'dof': dof,
+        'p_value': chi_square_sf(statistic, dof),
+        'min_expected': float(expected.min()),
+    }
+
+def leader_significance(counts, z=Z_95):
+    """1위와 2위 득표율 차이가 통계적으로 유의한지 검정합니다.
+
+    같은 표본에서 나온 다항분포 비율의 차이이므로 분산은 (p1 + p2 - (p1 - p2)²) / n 입니다.
+    반환값: {'leader', 'runner_up', 'z', 'significant'} (인덱스 기준), 후보가 2개 미만이면 None
+    """
+    counts = np.asarray(counts, dtype=float)
+    n = counts.sum()
+    if len(counts) < 2 or n == 0:
+        return None
+    order = np.argsort(-counts, kind='stable')
+    leader, runner_up = int(order[0]), int(order[1])
+    p1, p2 = counts[leader] / n, counts[runner_up] / n
+    variance = (p1 + p2 - (p1 - p2) ** 2) / n
+    z_score = float((p1 - p2) / math.sqrt(variance)) if variance > 0 else 0.0
+    return {
+        'leader': leader,
+        'runner_up': runner_up,
+        'z': z_score,
+        'significant': z_score > z,
+    }
@@ -0,0 +1,65 @@
+"""comment_keywords의 토큰화와 증분 색인 테스트"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from comment_keywords import CommentKeywordIndex, tokenize
+
+class TokenizeTest(unittest.TestCase):
+    def test_strips_particles_and_endings(self):
+        self.assertEqual(tokenize("피아노 반주가 마음에 남았습니다"), ['피아노', '반주', '마음', '남았'])
+        self.assertEqual(tokenize("록 버전이 신선했어요"), ['록', '신선'])
+
+    def test_keeps_nouns_that_end_like_particles(self):
+        # 떼고 나면 한 글자만 남는 단어는 그대로 둡니다.
+        self.assertEqual(tokenize("포도 회의"), ['포도', '회의'])
+        self.assertEqual(tokenize("같은"), ['같은'])
+
+    def test_no_single_syllable_stems(self):
+        for text in ["좋았어요", "슬픈 노래가 좋아요", "같은 노래"]:
+            for token in tokenize(text):
+                self.assertGreaterEqual(len(token), 2, (text, token))
+
+class CommentKeywordIndexTest(unittest.TestCase):
+    def frame(self, rows):
+        return pd.DataFrame(rows, columns=['시간', '버전', '연령대', '감상'])
+
+    def test_sync_only_reads_new_rows(self):
+        index = CommentKeywordIndex()
+        rows = [['t1', '버전 1', '20대', '피아노 반주가 좋아요']]
+        index.sync('shard', self.frame(rows))
+        rows.append(['t2', '버전 2', '30대', '피아노 소리'])
+        index.sync('shard', self.frame(rows))
+        self.assertEqual(index.top(n=1), [('피아노', 2)])
+        self.assertEqual(index.versions(), ['버전 1', '버전 2'])
+
+    def test_shrunken_shard_rebuilds(self):
+        index = CommentKeywordIndex()
+        index.sync('shard', self.frame([['t1', '버전 1', '20대', '피아노'], ['t2', '버전 1', '20대', '피아노']]))
+        index.sync('shard', self.frame([['t1', '버전 1', '20대', '피아노']]))
+        self.assertEqual(index.top('버전 1'), [('피아노', 1)])
+
+    def test_shrunken_shard_keeps_other_shards(self):
+        index = CommentKeywordIndex()
+        index.sync('응답_2025-04', self.frame([['t1', '버전 1', '20대', '피아노'], ['t2', '버전 2', '20대', '기타']]))
+        index.sync('응답_2025-05', self.frame([['t3', '버전 1', '20대', '피아노'], ['t4', '버전 1', '20대', '피아노']]))
+        index.sync('응답_2025-05', self.frame([['t3', '버전 1', '20대', '피아노']]))
+        self.assertEqual(index.top('버전 1'), [('피아노', 2)])
+        self.assertEqual(index.versions(), ['버전 1', '버전 2'])
+
+    def test_closed_shard_added_after_current(self):
+        # 재시작 뒤 현재 샤드를 먼저 읽고 지난 샤드를 나중에 채워도 합계에 모두 들어갑니다.
+        index = CommentKeywordIndex()
+        index.sync('응답_2025-05', self.frame([['t2', '버전 1', '20대', '피아노']]))
+        index.sync('응답_2025-04', self.frame([['t1', '버전 1', '20대', '피아노 반주']]))
+        index.sync('응답_2025-05', self.frame([['t2', '버전 1', '20대', '피아노'], ['t3', '버전 2', '20대', '반주']]))
+        self.assertEqual(index.top(n=2), [('피아노', 2), ('반주', 2)])
+        self.assertEqual(sorted(index.shards()), ['응답_2025-04', '응답_2025-05'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""sheet_shards의 샤드 회전과 Sheets 가드 연동 테스트"""
+
+from collections import Counter
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gspread
+
+from sheet_shards import ShardedWorksheet
+from sheets_guard import CircuitBreaker, SheetsGuard, TokenBucket
+
+HEADER = ['시간', '버전', '연령대', '감상']
+
+class FakeWorksheet:
+    def __init__(self, api, title, rows=()):
+        self.api = api
+        self.title = title
+        self.rows = [list(row) for row in rows]
+
+    def get_all_values(self):
+        self.api['get_all_values'] += 1
+        # Sheets는 모든 칸을 문자열로 돌려줍니다.
+        return [[str(cell) for cell in row] for row in self.rows]
+
+    def append_row(self, row, **kwargs):
+        self.api['append_row'] += 1
+        self.rows.append(list(row))
+
+    def append_rows(self, rows, **kwargs):
+        self.api['append_rows'] += 1
+        self.rows.extend(list(row) for row in rows)
+
+class FakeSpreadsheet:
+    def __init__(self, sheet1_rows):
+        self.api = Counter()
+        self.sheets = [FakeWorksheet(self.api, 'Sheet1', sheet1_rows)]
+
+    @property
+    def sheet1(self):
+        return self.sheets[0]
+
+    def worksheets(self):
+        self.api['worksheets'] += 1
+        return list(self.sheets)
+
+    def worksheet(self, title):
+        self.api['worksheet'] += 1
+        for ws in self.sheets:
+            if ws.title == title:
+                return ws
+        raise gspread.exceptions.WorksheetNotFound(title)
+
+    def add_worksheet(self, title, rows, cols):
+        self.api['add_worksheet'] += 1
+        ws = FakeWorksheet(self.api, title)
+        self.sheets.append(ws)
+        return ws
+
+class CountingMetrics:
+    def __init__(self):
+        self.counts = Counter()
+
+    def incr(self, name, amount=1):
+        self.counts[name] += amount
+
+def make_guard():
+    metrics = CountingMetrics()
+    guard = SheetsGuard(TokenBucket(1000), TokenBucket(1000), CircuitBreaker(3, 30), metrics)
+    return guard, metrics
+
+def vote(i, version='버전 1', age='20대'):
+    return [f'2025-05-01 12:00:{i:02d}', version, age, '']
+
+class ShardedWorksheetTest(unittest.TestCase):
+    def test_rotation_calls_go_through_guard(self):
+        spreadsheet = FakeSpreadsheet([HEADER, vote(0), vote(1)])
+        guard, metrics = make_guard()
+        shards = ShardedWorksheet(spreadsheet, HEADER, period='', max_rows=2, guard=guard)
+        spreadsheet.api.clear()
+        metrics.counts.clear()
+
+        # 바깥 호출 한 번 안에서 샤드 회전이 일어나도, 나간 API 호출은 모두 리미터에 세어집니다.
+        guard.call('write', shards.append_row, vote(2))
+        api_calls = sum(spreadsheet.api.values())
+        guarded = metrics.counts['sheets_read_calls'] + metrics.counts['sheets_write_calls']
+        self.assertGreater(api_calls, 1)
+        self.assertEqual(guarded, api_calls)
+        self.assertEqual(shards.title, '응답_')
+        self.assertEqual(guard.breaker.state()['state'], CircuitBreaker.CLOSED)
+
+    def test_rotated_shard_is_counted_once(self):
+        spreadsheet = FakeSpreadsheet([HEADER, vote(0), vote(1)])
+        shards = ShardedWorksheet(spreadsheet, HEADER, period='', max_rows=2)
+        shards.append_row(vote(2, version='버전 2'))
+
+        values, summary = shards.values_and_summary()
+        self.assertEqual(len(values) - 1, 1)
+        self.assertEqual(summary, {('20대', '버전 1'): 2})
+        self.assertEqual([ws.title for ws in shards.closed_shards()], ['Sheet1'])
+
+    def test_append_rows_rotates_before_batch(self):
+        spreadsheet = FakeSpreadsheet([HEADER, vote(0), vote(1)])
+        shards = ShardedWorksheet(spreadsheet, HEADER, period='', max_rows=2)
+        shards.append_rows([vote(2), vote(3)])
+        self.assertEqual([ws.title for ws in shards.shards()], ['Sheet1', '응답_'])
+        self.assertEqual(shards.get_all_values()[1:], [vote(2), vote(3)])
+
+    def test_works_without_guard(self):
+        spreadsheet = FakeSpreadsheet([HEADER])
+        shards = ShardedWorksheet(spreadsheet, HEADER, period='', max_rows=0)
+        shards.append_row(vote(0))
+        self.assertEqual(shards.get_all_values()[1:], [vote(0)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""sheets_guard의 서킷 브레이커와 SheetsGuard.call 상태 전이 테스트"""
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sheets_guard import CircuitBreaker, SheetsGuard, SheetsUnavailable, TokenBucket, WriteQueue
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code)
+
+def fail(status_code):
+    raise FakeAPIError(status_code)
+
+def make_guard(failure_threshold=1):
+    # reset_timeout=0이면 열린 브레이커가 다음 호출에서 바로 half_open이 됩니다.
+    breaker = CircuitBreaker(failure_threshold, reset_timeout=0)
+    return SheetsGuard(TokenBucket(1000), TokenBucket(1000), breaker), breaker
+
+class SheetsGuardBreakerTest(unittest.TestCase):
+    def test_transient_error_opens_breaker(self):
+        guard, breaker = make_guard()
+        with self.assertRaises(FakeAPIError):
+            guard.call('read', fail, 503)
+        self.assertEqual(breaker.state()['state'], CircuitBreaker.OPEN)
+
+    def test_success_in_half_open_closes_breaker(self):
+        guard, breaker = make_guard()
+        with self.assertRaises(FakeAPIError):
+            guard.call('read', fail, 503)
+        self.assertEqual(guard.call('read', lambda: 'ok'), 'ok')
+        self.assertEqual(breaker.state()['state'], CircuitBreaker.CLOSED)
+
+    def test_transient_error_in_half_open_reopens_breaker(self):
+        guard, breaker = make_guard(failure_threshold=3)
+        for _ in range(3):
+            with self.assertRaises(FakeAPIError):
+                guard.call('write', fail, 500)
+        with self.assertRaises(FakeAPIError):
+            guard.call('write', fail, 500)
+        self.assertEqual(breaker.state()['state'], CircuitBreaker.OPEN)
+
+    def test_non_transient_error_in_half_open_releases_trial(self):
+        guard, breaker = make_guard()
+        with self.assertRaises(FakeAPIError):
+            guard.call('read', fail, 503)
+        # 시험 호출이 400으로 끝나도 다음 호출이 다시 시험 호출이 될 수 있어야 합니다.
+        with self.assertRaises(FakeAPIError):
+            guard.call('read', fail, 400)
+        self.assertEqual(breaker.state()['state'], CircuitBreaker.HALF_OPEN)
+        for _ in range(3):
+            self.assertEqual(guard.call('read', lambda: 'ok'), 'ok')
+        self.assertEqual(breaker.state()['state'], CircuitBreaker.CLOSED)
+
+    def test_non_http_error_in_half_open_releases_trial(self):
+        guard, breaker = make_guard()
+        with self.assertRaises(FakeAPIError):
+            guard.call('read', fail, 503)
+
+        def broken():
+            raise KeyError('shard')
+
+        with self.assertRaises(KeyError):
+            guard.call('read', broken)
+        self.assertEqual(guard.call('read', lambda: 'ok'), 'ok')
+
+    def test_concurrent_trial_is_rejected_while_running(self):
+        guard, breaker = make_guard()
+        with self.assertRaises(FakeAPIError):
+            guard.call('read', fail, 503)
+
+        def trial():
+            # 시험 호출이 끝나기 전, 다른 스레드의 호출은 거절됩니다.
+            errors = []
+
+            def other():
+                try:
+                    guard.call('read', lambda: 'ok')
+                except SheetsUnavailable as e:
+                    errors.append(e)
+
+            thread = threading.Thread(target=other)
+            thread.start()
+            thread.join()
+            self.assertEqual(len(errors), 1)
+            return 'trial'
+
+        self.assertEqual(guard.call('read', trial), 'trial')
+        self.assertEqual(breaker.state()['state'], CircuitBreaker.CLOSED)
+
+    def test_nested_calls_take_tokens_without_breaker(self):
+        guard, breaker = make_guard()
+        with self.assertRaises(FakeAPIError):
+            guard.call('write', fail, 503)
+
+        def rotate():
+            # 바깥 호출(half_open 시험 호출) 안에서 나가는 추가 호출은 거절되지 않고 토큰만 씁니다.
+            guard.call('read', lambda: 'values')
+            guard.call('write', lambda: 'shard')
+            return 'written'
+
+        read_tokens = guard.limiters['read'].state()['tokens']
+        self.assertEqual(guard.call('write', rotate), 'written')
+        self.assertEqual(breaker.state()['state'], CircuitBreaker.CLOSED)
+        self.assertLess(guard.limiters['read'].state()['tokens'], read_tokens)
+
+    def test_nested_failure_is_judged_by_outer_call(self):
+        guard, breaker = make_guard(failure_threshold=1)
+
+        def rotate():
+            guard.call('write', fail, 503)
+
+        with self.assertRaises(FakeAPIError):
+            guard.call('write', rotate)
+        self.assertEqual(breaker.state()['state'], CircuitBreaker.OPEN)
+        self.assertEqual(breaker.state()['consecutive_failures'], 1)
+
+class FakeWorksheet:
+    def __init__(self, status_code=None):
+        self.status_code = status_code
+        self.rows = []
+
+    def append_row(self, row):
+        if self.status_code:
+            fail(self.status_code)
+        self.rows.append(row)
+
+class WriteQueueTest(unittest.TestCase):
+    def run_queue(self, worksheet):
+        guard, breaker = make_guard()
+        queue = WriteQueue(guard, retry_seconds=0.01)
+        done = threading.Event()
+        results = []
+
+        def record(result):
+            results.append(result)
+            done.set()
+
+        queue.put(worksheet, ['row'], on_written=lambda: record('written'), on_dropped=lambda: record('dropped'))
+        self.assertTrue(done.wait(5))
+        return results
+
+    def test_written_callback(self):
+        worksheet = FakeWorksheet()
+        self.assertEqual(self.run_queue(worksheet), ['written'])
+        self.assertEqual(worksheet.rows, [['row']])
+
+    def test_permanent_error_calls_dropped(self):
+        self.assertEqual(self.run_queue(FakeWorksheet(400)), ['dropped'])
+
+    def test_full_queue_rejects_put(self):
+        guard, breaker = make_guard()
+        queue = WriteQueue(guard, retry_seconds=0.01, max_items=1)
+        release = threading.Event()
+        worksheet = FakeWorksheet()
+        worksheet.append_row = lambda row: release.wait(5)
+        self.assertTrue(queue.put(worksheet, ['first']))
+        self.assertFalse(queue.put(worksheet, ['second']))
+        release.set()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""static_results의 결과 페이지 이스케이프 테스트"""
+
+import os
+import sys
+import types
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from static_results import build_results, render_chart_svg, render_html
+
+SCRIPT = '<script>alert("x")</script>'
+
+def make_results():
+    survey = types.SimpleNamespace(id='azalea', title=f'진달래꽃 {SCRIPT}')
+    crosstab = pd.DataFrame(
+        [[3, 1], [0, 2]],
+        index=['20대', f'<b>{SCRIPT}'],
+        columns=['버전 1', f'버전 "2" {SCRIPT}'],
+    )
+    df = pd.DataFrame(
+        [['t1', f'버전 "2" {SCRIPT}', '20대', f'좋아요 {SCRIPT} & <img src=x onerror=alert(1)>']],
+        columns=['시간', '버전', '연령대', '감상'],
+    )
+    results = build_results(survey, crosstab, df, keywords=[(SCRIPT, 3)])
+    results['generated_at'] = '2025-05-01 12:00:00'
+    return results
+
+class EscapeTest(unittest.TestCase):
+    def test_svg_escapes_labels(self):
+        svg = render_chart_svg(make_results())
+        self.assertNotIn('<script>', svg)
+        self.assertIn('&lt;script&gt;', svg)
+
+    def test_html_escapes_comments_and_labels(self):
+        results = make_results()
+        page = render_html(results, render_chart_svg(results))
+        self.assertNotIn('<script>', page)
+        self.assertNotIn('<img', page)
+        self.assertNotIn('<b><', page)
+        self.assertIn('&lt;img src=x onerror=alert(1)&gt;', page)
+        self.assertIn('&amp;', page)
+
+if __name__ == '__main__':
+    unittest.main()
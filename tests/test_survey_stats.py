@@ -0,0 +1,94 @@
+"""survey_stats의 신뢰구간, 카이제곱 검정, 1위 유의성 테스트"""
+
+import math
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from survey_stats import chi_square_independence, chi_square_sf, leader_significance, wilson_intervals
+
+class ChiSquareSfTest(unittest.TestCase):
+    # 급수 전개(x < a + 1)와 연분수 전개 구간을 모두 지나도록 통계량을 고릅니다.
+    STATISTICS = [0.01, 0.5, 1.0, 2.0, 3.84, 6.0, 10.0, 25.0]
+
+    def test_matches_closed_forms(self):
+        closed_forms = {
+            1: lambda x: math.erfc(math.sqrt(x / 2)),
+            2: lambda x: math.exp(-x / 2),
+            4: lambda x: math.exp(-x / 2) * (1 + x / 2),
+        }
+        for dof, expected in closed_forms.items():
+            for x in self.STATISTICS:
+                self.assertAlmostEqual(chi_square_sf(x, dof), expected(x), places=10, msg=(dof, x))
+
+    def test_edge_cases(self):
+        self.assertEqual(chi_square_sf(0.0, 3), 1.0)
+        self.assertEqual(chi_square_sf(5.0, 0), 1.0)
+        self.assertAlmostEqual(chi_square_sf(3.841458820694124, 1), 0.05, places=10)
+
+class ChiSquareIndependenceTest(unittest.TestCase):
+    def test_two_by_two(self):
+        result = chi_square_independence([[10, 20], [20, 10]])
+        self.assertAlmostEqual(result['statistic'], 20 / 3)
+        self.assertEqual(result['dof'], 1)
+        self.assertAlmostEqual(result['p_value'], math.erfc(math.sqrt(10 / 3)))
+        self.assertEqual(result['min_expected'], 15.0)
+
+    def test_smaller_than_two_by_two(self):
+        self.assertIsNone(chi_square_independence([[3, 4, 5]]))
+        self.assertIsNone(chi_square_independence([[3], [4]]))
+        # 합이 0인 행/열을 빼고 나면 1행만 남는 표
+        self.assertIsNone(chi_square_independence([[3, 4], [0, 0]]))
+        self.assertIsNone(chi_square_independence([[0, 0], [0, 0]]))
+
+    def test_zero_rows_and_columns_are_dropped(self):
+        full = chi_square_independence([[10, 20], [20, 10]])
+        padded = chi_square_independence([[10, 0, 20], [0, 0, 0], [20, 0, 10]])
+        self.assertEqual(padded, full)
+
+class WilsonIntervalsTest(unittest.TestCase):
+    def test_known_interval(self):
+        p, low, high = wilson_intervals([5, 5])
+        self.assertAlmostEqual(p[0], 0.5)
+        self.assertAlmostEqual(low[0], 0.236593, places=6)
+        self.assertAlmostEqual(high[0], 0.763407, places=6)
+
+    def test_bounds_stay_in_unit_interval(self):
+        p, low, high = wilson_intervals([0, 7])
+        self.assertTrue(((low >= 0) & (low <= p) & (p <= high) & (high <= 1)).all())
+        self.assertAlmostEqual(low[0], 0.0)
+        self.assertAlmostEqual(high[1], 1.0)
+        # 0표여도 상한은 0보다 커서 "아직 모름"을 나타냅니다.
+        self.assertGreater(high[0], 0.2)
+
+    def test_no_votes(self):
+        p, low, high = wilson_intervals([0, 0, 0])
+        for values in (p, low, high):
+            self.assertEqual(list(values), [0.0, 0.0, 0.0])
+
+class LeaderSignificanceTest(unittest.TestCase):
+    def test_clear_leader(self):
+        result = leader_significance([40, 5, 5])
+        self.assertEqual((result['leader'], result['runner_up']), (0, 1))
+        self.assertTrue(result['significant'])
+
+    def test_close_race(self):
+        result = leader_significance([6, 5, 1])
+        self.assertFalse(result['significant'])
+        self.assertGreater(result['z'], 0)
+
+    def test_tie(self):
+        # 동점이면 앞선 버전을 1위로 두고, 차이는 0입니다.
+        result = leader_significance([3, 7, 7])
+        self.assertEqual((result['leader'], result['runner_up']), (1, 2))
+        self.assertEqual(result['z'], 0.0)
+        self.assertFalse(result['significant'])
+
+    def test_not_enough_data(self):
+        self.assertIsNone(leader_significance([0, 0]))
+        self.assertIsNone(leader_significance([9]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""vote_guard의 클라이언트 지문 테스트"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest import mock
+
+from vote_guard import client_address, client_fingerprint, xsrf_token_bytes
+
+SALT = b'test-salt'
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+def masked_cookie(token, mask, timestamp=1760000000):
+    """Streamlit이 발급하는 v2 XSRF 쿠키 문자열을 만듭니다."""
+    masked = bytes(byte ^ mask[i % len(mask)] for i, byte in enumerate(token))
+    return f"2|{mask.hex()}|{masked.hex()}|{timestamp}"
+
+class ClientFingerprintTest(unittest.TestCase):
+    def test_unmasks_v2_token(self):
+        token = bytes(range(16))
+        self.assertEqual(xsrf_token_bytes(masked_cookie(token, b'\x01\x02\x03\x04')), token)
+
+    def test_reissued_cookie_keeps_fingerprint(self):
+        # 새로고침 때 마스크와 시각만 바뀐 쿠키가 다시 발급되어도 같은 지문이어야 합니다.
+        token = os.urandom(16)
+        first = masked_cookie(token, b'\x11\x22\x33\x44', 1760000000)
+        second = masked_cookie(token, b'\xaa\xbb\xcc\xdd', 1760000100)
+        self.assertNotEqual(first, second)
+        self.assertEqual(
+            client_fingerprint(HEADERS, {'_streamlit_xsrf': first}, SALT),
+            client_fingerprint(HEADERS, {'_streamlit_xsrf': second}, SALT),
+        )
+
+    def test_different_browsers_differ(self):
+        mask = b'\x11\x22\x33\x44'
+        self.assertNotEqual(
+            client_fingerprint(HEADERS, {'_streamlit_xsrf': masked_cookie(os.urandom(16), mask)}, SALT),
+            client_fingerprint(HEADERS, {'_streamlit_xsrf': masked_cookie(os.urandom(16), mask)}, SALT),
+        )
+
+    def test_undecodable_cookie_falls_back_to_raw_value(self):
+        self.assertIsNone(xsrf_token_bytes('2|zz|zz|1'))
+        self.assertEqual(
+            client_fingerprint(HEADERS, {'_xsrf': 'not-hex'}, SALT),
+            client_fingerprint(HEADERS, {'_xsrf': 'not-hex'}, SALT),
+        )
+
+    def test_non_string_values_are_absent(self):
+        # AppTest처럼 쿠키가 가짜 객체로 채워져도 매번 다른 지문이 나오면 안 됩니다.
+        cookies = {'_streamlit_xsrf': mock.MagicMock()}
+        headers = {'User-Agent': mock.MagicMock()}
+        self.assertEqual(
+            client_fingerprint(headers, cookies, SALT, '10.0.0.1'),
+            client_fingerprint({}, {}, SALT, '10.0.0.1'),
+        )
+
+class ClientAddressTest(unittest.TestCase):
+    def test_forwarded_header_ignored_without_trusted_proxy(self):
+        headers = {'X-Forwarded-For': '203.0.113.7'}
+        self.assertEqual(client_address(headers, '198.51.100.2'), '198.51.100.2')
+        # 쿠키 없이 헤더만 바꿔 보내도 지문이 새로 생기지 않습니다.
+        self.assertEqual(
+            client_fingerprint({'X-Forwarded-For': '1.1.1.1'}, {}, SALT, client_address(headers, '198.51.100.2')),
+            client_fingerprint({'X-Forwarded-For': '2.2.2.2'}, {}, SALT, client_address(headers, '198.51.100.2')),
+        )
+
+    def test_trusted_proxy_uses_last_forwarded_address(self):
+        headers = {'X-Forwarded-For': '1.1.1.1, 203.0.113.7'}
+        self.assertEqual(client_address(headers, None, trusted_proxy=True), '203.0.113.7')
+        self.assertEqual(client_address({}, None, trusted_proxy=True), '')
+
+if __name__ == '__main__':
+    unittest.main()
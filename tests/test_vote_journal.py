@@ -0,0 +1,138 @@
+"""vote_journal의 기록·복구 테스트"""
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import vote_journal
+from vote_journal import VoteJournal, count_votes, read_votes, scan_journal
+
+def row(version, age='20대'):
+    return ['2025-05-01 12:00:00', version, age, '']
+
+class VoteJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'survey.jsonl')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_unacked_votes_are_recovered_on_reopen(self):
+        journal = VoteJournal(self.path)
+        saved = journal.append(row('버전 1'))
+        journal.append(row('버전 2'))
+        journal.ack(saved)
+        journal.close()
+
+        journal = VoteJournal(self.path)
+        self.assertEqual([r[1] for seq, r in journal.take_recovered()], ['버전 2'])
+        self.assertEqual(journal.take_recovered(), [])
+        journal.close()
+
+    def test_failed_vote_is_not_replayed_or_counted(self):
+        journal = VoteJournal(self.path)
+        failed = journal.append(row('버전 1'))
+        saved = journal.append(row('버전 2'))
+        journal.fail(failed)
+        journal.ack(saved)
+        self.assertEqual(journal.pending(), [])
+        journal.close()
+
+        last_seq, unacked = scan_journal(self.path)
+        self.assertEqual(unacked, {})
+        self.assertEqual([seq for seq, r in read_votes(self.path)], [saved])
+        counts, _ = count_votes(read_votes(self.path))
+        self.assertEqual(dict(counts), {('20대', '버전 2'): 1})
+
+        journal = VoteJournal(self.path)
+        self.assertEqual(journal.take_recovered(), [])
+        journal.close()
+
+    def test_truncated_last_line_is_skipped(self):
+        journal = VoteJournal(self.path)
+        journal.append(row('버전 1'))
+        journal.close()
+        with open(self.path, 'ab') as f:
+            f.write(b'{"seq": 2, "type": "vo')
+
+        journal = VoteJournal(self.path)
+        seq = journal.append(row('버전 3'))
+        self.assertEqual(seq, 2)
+        journal.close()
+        self.assertEqual([r[1] for s, r in read_votes(self.path)], ['버전 1', '버전 3'])
+
+HEADER = ['시간', '버전', '연령대', '감상']
+
+class FakeSheet:
+    def __init__(self, title, rows=()):
+        self.title = title
+        self.rows = [HEADER] + [list(r) for r in rows]
+
+    def get_all_values(self):
+        return [list(r) for r in self.rows]
+
+    def append_rows(self, rows):
+        self.rows.extend(list(r) for r in rows)
+
+class FakeShardedStorage:
+    """ShardedWorksheet처럼 지난 샤드와 현재 샤드를 가진 저장소"""
+
+    def __init__(self, *shards):
+        self._shards = list(shards)
+        self.title = self._shards[-1].title
+
+    def shards(self):
+        return list(self._shards)
+
+    def append_rows(self, rows):
+        self._shards[-1].append_rows(rows)
+
+class JournalCommandTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'azalea.jsonl')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def run_command(self, storage, *args):
+        survey = types.SimpleNamespace(columns=HEADER)
+        with mock.patch.object(vote_journal, '_open_storage', return_value=(survey, storage)) as opened:
+            vote_journal.main([args[0], self.path] + list(args[1:]))
+        opened.assert_called_once_with('azalea')
+
+    def test_import_reads_every_shard(self):
+        storage = FakeShardedStorage(
+            FakeSheet('Sheet1', [row('버전 1')]),
+            FakeSheet('응답_2025-04', [row('버전 2'), row('버전 2')]),
+            FakeSheet('응답_2025-05', [row('버전 3')]),
+        )
+        self.run_command(storage, 'import')
+        counts, _ = count_votes(read_votes(self.path))
+        self.assertEqual(sum(counts.values()), 4)
+        self.assertEqual(scan_journal(self.path)[1], {})
+
+    def test_replay_writes_to_active_shard(self):
+        journal = VoteJournal(self.path)
+        journal.append(row('버전 1'))
+        journal.close()
+        old, active = FakeSheet('Sheet1'), FakeSheet('응답_2025-05')
+        self.run_command(FakeShardedStorage(old, active), 'replay')
+        self.assertEqual(len(old.rows), 1)
+        self.assertEqual(active.rows[1:], [row('버전 1')])
+        self.assertEqual(scan_journal(self.path)[1], {})
+
+    def test_resync_is_refused_for_sharded_storage(self):
+        active = FakeSheet('응답_2025-05', [row('버전 1')])
+        with mock.patch('sys.stderr'), self.assertRaises(SystemExit):
+            self.run_command(FakeShardedStorage(FakeSheet('Sheet1'), active), 'resync')
+        self.assertEqual(active.rows[1:], [row('버전 1')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+진달래꽃 음악 선호도 조사 - 투표 남용 방지
+익명 클라이언트 지문, 메모리 상한이 있는 최근 투표 색인, 슬라이딩 윈도 투표 리미터를 제공합니다.
+"""
+
+from collections import OrderedDict, deque
+import hashlib
+import hmac
+import threading
+import time
+
+# Streamlit(Tornado)이 브라우저마다 발급하는 XSRF 쿠키 - 새로고침해도 안의 토큰은 유지됩니다.
+SESSION_COOKIE_NAMES = ('_streamlit_xsrf', '_xsrf')
+
+def xsrf_token_bytes(value):
+    """XSRF 쿠키 값에서 마스크를 벗긴 토큰 bytes를 꺼냅니다 (해석할 수 없으면 None).
+
+    v2 형식(2|마스크|마스킹된 토큰|시각)은 서버가 응답할 때마다 마스크를 새로 정해 다시 발급하므로
+    쿠키 문자열은 새로고침마다 바뀌지만, 마스크를 벗긴 토큰은 브라우저가 바뀌지 않는 한 그대로입니다.
+    """
+    value = value.strip("\"'")
+    try:
+        if value.startswith('2|'):
+            _, mask_hex, masked_hex, _ = value.split('|')
+            mask = bytes.fromhex(mask_hex)
+            masked = bytes.fromhex(masked_hex)
+            if not mask:
+                return None
+            return bytes(byte ^ mask[i % len(mask)] for i, byte in enumerate(masked))
+        return bytes.fromhex(value) or None
+    except ValueError:
+        return None
+
+def _text(value):
+    """문자열 헤더/쿠키 값만 받아들이고, 그 밖의 값(없는 값, 테스트용 가짜 객체 등)은 빈 문자열로 봅니다."""
+    return value if isinstance(value, str) else ''
+
+def client_address(headers, peer_ip, trusted_proxy=False):
+    """투표 제한에 쓸 접속 주소를 정합니다.
+
+    X-Forwarded-For는 클라이언트가 마음대로 채울 수 있으므로, 앞단 프록시를 믿도록 설정했을 때만
+    프록시가 맨 뒤에 덧붙인 주소를 씁니다. 그 밖에는 소켓 상대 주소(peer_ip)를 씁니다.
+    """
+    if trusted_proxy:
+        forwarded = _text(headers.get('X-Forwarded-For'))
+        client_ip = forwarded.split(',')[-1].strip() or _text(headers.get('X-Real-Ip')).strip()
+        if client_ip:
+            return client_ip
+    return _text(peer_ip)
+
+def client_fingerprint(headers, cookies, salt, address=''):
+    """요청 헤더와 쿠키로 익명 클라이언트 지문(16바이트)을 만듭니다.
+
+    브라우저 쿠키가 있으면 쿠키 안의 XSRF 토큰과 User-Agent를, 없으면 접속 주소(client_address)·
+    User-Agent·언어를 salt와 함께 HMAC으로 해시하므로 원래 값은 저장되지 않습니다.
+    """
+    user_agent = _text(headers.get('User-Agent'))
+    cookie = next((_text(cookies.get(name)) for name in SESSION_COOKIE_NAMES if _text(cookies.get(name))), '')
+    if cookie:
+        token = xsrf_token_bytes(cookie)
+        parts = ['cookie', token.hex() if token else cookie, user_agent]
+    else:
+        parts = ['ip', address, user_agent, _text(headers.get('Accept-Language'))]
+    message = '\x1f'.join(parts).encode('utf-8')
+    return hmac.new(salt, message, hashlib.sha256).digest()[:16]
+
+class RecentVoteIndex:
+    """최근 window_seconds 동안 투표한 지문을 기억하는 시간 창 LRU 집합입니다.
+
+    항목 수가 max_entries를 넘으면 가장 오래된 지문부터 버리므로 메모리가 일정하게 유지되고,
+    조회는 dict 한 번이라 투표 경로에 Sheets 왕복이 추가되지 않습니다.
+    """
+
+    def __init__(self, window_seconds, max_entries):
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        while self._entries:
+            key, added_at = next(iter(self._entries.items()))
+            if now - added_at <= self.window_seconds and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+
+    def check_and_add(self, key):
+        """이미 창 안에 있는 지문이면 True, 처음이면 기록하고 False를 반환합니다."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if key in self._entries:
+                return True
+            self._entries[key] = now
+            self._expire(now)
+            return False
+
+    def discard(self, key):
+        """저장에 실패한 투표의 지문을 지워 다시 투표할 수 있게 합니다."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+class SlidingWindowLimiter:
+    """키별로 최근 window_seconds 동안의 시도 횟수를 제한하는 슬라이딩 윈도 리미터입니다.
+
+    키(클라이언트 지문)는 최대 max_keys개까지만 LRU로 기억합니다.
+    """
+
+    def __init__(self, limit, window_seconds, max_keys=10000):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._hits = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key):
+        """시도를 기록합니다. 허용되면 0, 거절되면 다시 시도할 수 있기까지 남은 초를 반환합니다."""
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.pop(key, None)
+            if hits is None:
+                hits = deque()
+            while hits and now - hits[0] > self.window_seconds:
+                hits.popleft()
+            self._hits[key] = hits
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+            if len(hits) >= self.limit:
+                return self.window_seconds - (now - hits[0])
+            hits.append(now)
+            return 0
+
+    def __len__(self):
+        return len(self._hits)
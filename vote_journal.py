@@ -0,0 +1,285 @@
+"""
+진달래꽃 음악 선호도 조사 - 투표 저널
+투표를 저장소에 쓰기 전에 로컬 파일에 한 줄씩 덧붙여 기록합니다 (append-only JSONL).
+프로세스가 저장 도중 죽거나 Sheets가 내려가도 투표가 남고, 저널만으로
+다른 저장소에 다시 쓰거나(replay) 시트를 처음부터 다시 만들 수 있습니다(resync).
+
+기록 형식 (한 줄에 하나, seq는 파일 안에서 1씩 증가):
+    {"seq": 7, "type": "vote", "row": ["2025-05-01 12:00:00", "버전 3", "20대", "좋아요"]}
+    {"seq": 8, "type": "ack", "ref": 7}      # seq 7 투표가 저장소에 저장됨
+    {"seq": 9, "type": "fail", "ref": 7}     # seq 7 투표를 저장하지 못하고 포기함 (다시 보내지 않음)
+
+사용법: python vote_journal.py {stats|pending|replay|resync|import} 저널파일 [--survey 설문id] [--all]
+"""
+
+from collections import Counter, deque
+import argparse
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 응답 행 열 순서: 시간, 버전, 연령대, 감상
+VERSION_INDEX = 1
+AGE_INDEX = 2
+
+class JournalLocked(Exception):
+    """다른 프로세스가 이미 같은 저널 파일을 쓰고 있을 때 발생합니다."""
+
+def read_records(path):
+    """저널 파일을 한 줄씩 읽어 기록(dict)을 차례로 돌려줍니다.
+
+    파일 전체를 메모리에 올리지 않으며, 기록 도중 끊긴 마지막 줄처럼 읽을 수 없는 줄은 건너뜁니다.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and 'seq' in record:
+                yield record
+
+def read_votes(path):
+    """저널 파일의 (seq, 행)을 기록 순서대로 돌려줍니다 (저장에 실패해 포기한 투표는 뺍니다)."""
+    failed = {record.get('ref') for record in read_records(path) if record.get('type') == 'fail'}
+    for record in read_records(path):
+        if record.get('type') == 'vote' and record['seq'] not in failed:
+            yield record['seq'], record['row']
+
+def scan_journal(path):
+    """저널 파일을 끝까지 읽어 (마지막 seq, {아직 ack·fail되지 않은 seq: 행})을 반환합니다."""
+    last_seq = 0
+    unacked = {}
+    for record in read_records(path):
+        last_seq = max(last_seq, record['seq'])
+        if record.get('type') == 'vote':
+            unacked[record['seq']] = record['row']
+        elif record.get('type') in ('ack', 'fail'):
+            unacked.pop(record.get('ref'), None)
+    return last_seq, unacked
+
+class VoteJournal:
+    """fsync를 묶어서 처리하는 append-only 투표 저널입니다.
+
+    append()는 기록을 OS까지 넘긴 뒤 바로 돌아오므로 프로세스가 죽어도 기록은 남습니다.
+    디스크 fsync는 백그라운드 스레드가 fsync_interval초마다 모아서 한 번에 합니다
+    (전원이 나가면 마지막 fsync_interval초 동안의 기록만 잃을 수 있습니다).
+    파일을 열 때 끝까지 읽어 마지막 seq와 아직 ack·fail되지 않은 투표를 복구합니다.
+    """
+
+    def __init__(self, path, fsync_interval=0.05):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._seq, self._unacked = scan_journal(path)
+        self._recovered = dict(self._unacked)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'ab')
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError as e:
+                self._file.close()
+                raise JournalLocked(f"{path}: 다른 프로세스가 사용 중입니다.") from e
+        # 끊긴 마지막 줄 뒤에 이어 쓰지 않도록 줄바꿈으로 시작합니다.
+        if self._file.tell() > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write(b'\n')
+
+        self._thread = threading.Thread(target=self._run, name="vote-journal-fsync", daemon=True)
+        self._thread.start()
+
+    def _write(self, record):
+        with self._lock:
+            self._seq += 1
+            record = {'seq': self._seq, **record}
+            self._file.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+            self._file.flush()
+        self._dirty.set()
+        return record['seq']
+
+    def append(self, row):
+        """투표 한 줄을 기록하고 seq를 반환합니다."""
+        seq = self._write({'type': 'vote', 'at': time.time(), 'row': list(row)})
+        with self._lock:
+            self._unacked[seq] = list(row)
+        return seq
+
+    def _resolve(self, seq, kind):
+        with self._lock:
+            if self._unacked.pop(seq, None) is None:
+                return
+        self._write({'type': kind, 'ref': seq})
+
+    def ack(self, seq):
+        """seq 투표가 저장소에 저장되었음을 기록합니다."""
+        self._resolve(seq, 'ack')
+
+    def fail(self, seq):
+        """seq 투표를 저장하지 못하고 포기했음을 기록합니다. 다음 실행에서 다시 보내지 않습니다."""
+        self._resolve(seq, 'fail')
+
+    def pending(self):
+        """아직 ack·fail되지 않은 [(seq, 행)] 목록입니다."""
+        with self._lock:
+            return sorted(self._unacked.items())
+
+    def take_recovered(self):
+        """파일을 열 때 ack·fail되지 않은 채 남아 있던 투표를 한 번만 돌려줍니다 (재시도용)."""
+        with self._lock:
+            recovered, self._recovered = sorted(self._recovered.items()), {}
+        return recovered
+
+    def sync(self):
+        """지금까지의 기록을 디스크에 fsync합니다."""
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _run(self):
+        while True:
+            self._dirty.wait()
+            time.sleep(self.fsync_interval)
+            self._dirty.clear()
+            try:
+                self.sync()
+            except (OSError, ValueError):
+                return
+
+    def votes(self):
+        """기록된 (seq, 행)을 파일 순서대로 돌려줍니다 (포기한 투표 제외)."""
+        self.sync()
+        return read_votes(self.path)
+
+    def __len__(self):
+        return self._seq
+
+    def close(self):
+        self.sync()
+        self._file.close()
+
+def replay(votes, sink, batch_size=500):
+    """(seq, 행)들을 batch_size개씩 묶어 sink(rows, seqs)로 넘기고 넘긴 투표 수를 반환합니다.
+
+    sink는 어떤 저장소든 될 수 있습니다 (워크시트 append_rows, CSV writer, DB insert ...).
+    """
+    rows, seqs, total = [], [], 0
+    for seq, row in votes:
+        rows.append(row)
+        seqs.append(seq)
+        if len(rows) >= batch_size:
+            sink(rows, seqs)
+            total += len(rows)
+            rows, seqs = [], []
+    if rows:
+        sink(rows, seqs)
+        total += len(rows)
+    return total
+
+def count_votes(votes, recent=0):
+    """(seq, 행)들을 한 번 훑어 ({(연령대, 버전): 득표수}, 최근 recent개 행)을 반환합니다."""
+    counts = Counter()
+    tail = deque(maxlen=recent) if recent else None
+    for seq, row in votes:
+        if len(row) <= AGE_INDEX or not str(row[0]).strip():
+            continue
+        counts[(str(row[AGE_INDEX]).strip(), str(row[VERSION_INDEX]).strip())] += 1
+        if tail is not None:
+            tail.append(row)
+    return counts, list(tail or [])
+
+def resync_worksheet(votes, worksheet, header, batch_size=500):
+    """워크시트를 비우고 헤더와 저널의 모든 투표로 처음부터 다시 채웁니다."""
+    worksheet.clear()
+    worksheet.append_row(list(header))
+    return replay(votes, lambda rows, seqs: worksheet.append_rows(rows), batch_size)
+
+def _open_storage(survey_id):
+    """CLI용: 앱과 같은 설정(SHEETS_SHARDING 포함)으로 설문의 저장소를 열어 (설문, 워크시트)를 반환합니다.
+
+    샤드를 쓰면 워크시트는 ShardedWorksheet이므로, 다시 보낸 투표도 현재 샤드에 들어가 집계됩니다.
+    """
+    import survey_backend
+
+    survey = survey_backend.load_survey(survey_id)
+    if survey is None:
+        raise SystemExit(f"'{survey_id}' 설문을 찾을 수 없습니다.")
+    client, worksheet = survey_backend.open_survey_sheets(survey)
+    if worksheet is None:
+        raise SystemExit("Google Sheets에 연결할 수 없습니다 (GOOGLE_CREDENTIALS와 스프레드시트 id를 확인하세요).")
+    return survey, worksheet
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="투표 저널 관리")
+    parser.add_argument('command', choices=['stats', 'pending', 'replay', 'resync', 'import'])
+    parser.add_argument('journal', help="저널 파일 경로 (예: journal/azalea.jsonl)")
+    parser.add_argument('--survey', help="설문 id (없으면 저널 파일 이름, 예: azalea)")
+    parser.add_argument('--all', action='store_true', help="replay: ack된 투표까지 모두 보냄")
+    args = parser.parse_args(argv)
+
+    # 읽기만 하는 명령은 앱이 저널을 쓰는 중에도 실행할 수 있습니다.
+    if args.command == 'stats':
+        last_seq, unacked = scan_journal(args.journal)
+        counts, _ = count_votes(read_votes(args.journal))
+        print(f"기록 {last_seq}건, 투표 {sum(counts.values())}표, 미저장 {len(unacked)}표")
+        for (age, version), count in sorted(counts.items()):
+            print(f"  {version}\t{age}\t{count}")
+        return
+    if args.command == 'pending':
+        last_seq, unacked = scan_journal(args.journal)
+        for seq, row in sorted(unacked.items()):
+            print(seq, json.dumps(row, ensure_ascii=False))
+        return
+
+    survey, worksheet = _open_storage(args.survey or os.path.splitext(os.path.basename(args.journal))[0])
+    shards = getattr(worksheet, 'shards', None)
+    if args.command == 'resync' and shards is not None:
+        # 지난 샤드는 요약 시트에 이미 집계되어 있어, 한 시트를 전체 이력으로 다시 채우면 두 번 세어집니다.
+        parser.error("resync는 샤드 저장소(SHEETS_SHARDING=on)에서 쓸 수 없습니다. 미저장 투표는 replay를 쓰세요.")
+
+    journal = VoteJournal(args.journal)
+    try:
+        if args.command == 'replay':
+            votes = journal.votes() if args.all else iter(journal.pending())
+
+            def sink(rows, seqs):
+                worksheet.append_rows(rows)
+                for seq in seqs:
+                    journal.ack(seq)
+
+            print(f"{replay(votes, sink)}표를 {worksheet.title} 시트에 다시 저장했습니다.")
+        elif args.command == 'resync':
+            total = resync_worksheet(journal.votes(), worksheet, survey.columns)
+            for seq, row in journal.pending():
+                journal.ack(seq)
+            print(f"{worksheet.title} 시트를 저널의 {total}표로 다시 만들었습니다.")
+        elif args.command == 'import':
+            # 저널을 처음 켤 때 기존 응답(샤드를 쓰면 지난 샤드 전부와 현재 샤드)을 저장된 투표로 가져와
+            # 저널이 전체 이력을 갖게 합니다.
+            total = 0
+            for sheet in (shards() if shards is not None else [worksheet]):
+                rows = [row for row in sheet.get_all_values()[1:] if row and str(row[0]).strip()]
+                for row in rows:
+                    journal.ack(journal.append(row))
+                total += len(rows)
+                print(f"{sheet.title} 시트에서 {len(rows)}표를 가져왔습니다.")
+            print(f"모두 {total}표를 가져왔습니다.")
+    finally:
+        journal.close()
+
+if __name__ == '__main__':
+    main()